@@ -0,0 +1,303 @@
+import pygame
+import os
+from collections import OrderedDict, namedtuple
+from settings import *
+
+class ImageRegistry:
+    # Decodes every image file once and keeps one pre-scaled copy per size, so
+    # entity constructors never touch the disk. Keys are (filename, size, alpha,
+    # colorkey). Callers must treat returned surfaces as read-only.
+    def __init__(self):
+        self.sources = {}
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+
+    def get(self, filename, size, alpha=True, colorkey=False, fallback=None):
+        key = (filename, size, alpha, colorkey)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        source = self._source(filename, alpha, colorkey)
+        if source is not None:
+            surf = pygame.transform.scale(source, size)
+        elif fallback:
+            surf = fallback(size)
+        else:
+            surf = self._solid(size, MAGENTA)
+        self.cache[key] = surf
+        return surf
+
+    def _source(self, filename, alpha, colorkey):
+        key = (filename, alpha, colorkey)
+        if key in self.sources:
+            return self.sources[key]
+
+        surf = None
+        image_path = os.path.join(IMAGE_DIR, filename)
+        if os.path.exists(image_path):
+            try:
+                self.disk_loads += 1
+                surf = pygame.image.load(image_path)
+                # convert() needs a display mode; headless tools may not have one
+                if pygame.display.get_surface() is not None:
+                    surf = surf.convert_alpha() if alpha else surf.convert()
+                if colorkey:
+                    # Assumes top-left pixel is background color
+                    surf.set_colorkey(surf.get_at((0, 0)))
+            except pygame.error as e:
+                print(f"Error loading image {filename}: {e}")
+                surf = None
+        self.sources[key] = surf
+        return surf
+
+    def _solid(self, size, color):
+        surf = pygame.Surface(size)
+        surf.fill(color)
+        return surf
+
+    def clear(self):
+        self.sources.clear()
+        self.cache.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_loads': self.disk_loads,
+        }
+
+class FontRegistry:
+    # Every font in FONTS, loaded once and shared. Resolving a family scans
+    # the system font list (slow, especially the first time), so load_all()
+    # runs at startup and nothing looks a font up mid-game. Families are
+    # tried in order; pygame's default font is the last resort. Bold falls
+    # back to synthetic bold when the family has no bold face, as SysFont does.
+    def __init__(self, specs=FONTS):
+        self.specs = specs
+        self.fonts = {}
+        self.paths = {}
+        self.lookups = 0
+
+    def get(self, name):
+        font = self.fonts.get(name)
+        if font is None:
+            font = self.fonts[name] = self._load(*self.specs[name])
+        return font
+
+    def load_all(self):
+        for name in self.specs:
+            self.get(name)
+
+    def _load(self, families, size, bold):
+        path, synthetic_bold = self._resolve(families, bold)
+        font = pygame.font.Font(path, size)
+        if synthetic_bold:
+            font.set_bold(True)
+        return font
+
+    def _resolve(self, families, bold):
+        key = (families, bold)
+        if key not in self.paths:
+            self.lookups += 1
+            resolved = (None, bold)
+            for family in families:
+                path = pygame.font.match_font(family, bold=bold)
+                if path:
+                    # match_font() returns the regular face when there is no bold one
+                    resolved = (path, bold and path == pygame.font.match_font(family))
+                    break
+            self.paths[key] = resolved
+        return self.paths[key]
+
+    def clear(self):
+        self.fonts.clear()
+
+    def stats(self):
+        return {
+            'fonts': len(self.fonts),
+            'lookups': self.lookups,
+        }
+
+class RotationCache:
+    # Pre-rotated copies of a surface, keyed by (name, angle bucket). Angles are
+    # quantized to `step` degrees so a whole boss volley shares a handful of
+    # surfaces. Least recently used entries are evicted past `max_entries`.
+    def __init__(self, step=ROTATION_STEP, max_entries=ROTATION_CACHE_SIZE):
+        self.step = step
+        self.buckets = int(round(360 / step))
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bucket(self, angle):
+        return int(round(angle / self.step)) % self.buckets
+
+    def get(self, name, surface, angle):
+        # Returns (rotated_surface, (width, height))
+        key = (name, self.bucket(angle))
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        rotated = pygame.transform.rotate(surface, key[1] * self.step)
+        entry = (rotated, rotated.get_size())
+        self.cache[key] = entry
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def prebuild(self, name, surface):
+        # Fill every bucket for `name` ahead of time (e.g. during loading)
+        for b in range(self.buckets):
+            key = (name, b)
+            if key not in self.cache:
+                rotated = pygame.transform.rotate(surface, b * self.step)
+                self.cache[key] = (rotated, rotated.get_size())
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+# One precomputed rotation step: the rotated image, its size and the offset from
+# the sprite center to the rect's top-left. Collisions are rect-based, so
+# frames carry no mask.
+RotationFrame = namedtuple('RotationFrame', 'image size offset')
+
+class FlipbookCache:
+    # Full turns of pre-rotated frames, shared by every sprite that uses the same
+    # source name and size bucket. Rotating becomes a list index.
+    def __init__(self, frame_count=METEOR_ROTATION_FRAMES):
+        self.frame_count = frame_count
+        self.step = 360 / frame_count
+        self.books = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, size, surface):
+        key = (name, size)
+        book = self.books.get(key)
+        if book is not None:
+            self.hits += 1
+            return book
+
+        self.misses += 1
+        book = []
+        for i in range(self.frame_count):
+            rotated = pygame.transform.rotate(surface, i * self.step)
+            w, h = rotated.get_size()
+            book.append(RotationFrame(rotated, (w, h), (w // 2, h // 2)))
+        self.books[key] = book
+        return book
+
+    def index(self, angle):
+        return int(round(angle / self.step)) % self.frame_count
+
+    def memory_by_bucket(self):
+        # Approximate image bytes held per (name, size) bucket
+        usage = {}
+        for key, book in self.books.items():
+            total = 0
+            for frame in book:
+                w, h = frame.size
+                total += w * h * frame.image.get_bytesize()
+            usage[key] = total
+        return usage
+
+    def stats(self):
+        usage = self.memory_by_bucket()
+        return {
+            'books': len(self.books),
+            'hits': self.hits,
+            'misses': self.misses,
+            'bytes': sum(usage.values()),
+        }
+
+    def memory_stats(self):
+        # KB per size bucket, for the F3 overlay
+        return {size: total // 1024 for (name, size), total in sorted(self.memory_by_bucket().items())}
+
+class ScaledImageCache:
+    # Sprite images resized for a render scale below 1 (see Renderer), one
+    # table per scale keyed by the source surface. Sources are shared
+    # registry surfaces, so a table only fills up when per-sprite surfaces
+    # (background objects, evicted rotations) come and go; past
+    # `max_entries` it is dropped and refilled on demand.
+    def __init__(self, max_entries=SCALED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.tables = {}
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+
+    def get(self, surface, scale):
+        return self.get_all([surface], scale)[0]
+
+    def get_all(self, surfaces, scale):
+        # Resized copies of `surfaces`, in order
+        table = self.tables.get(scale)
+        if table is None:
+            table = self.tables[scale] = {}
+        scaled = list(map(table.get, surfaces))
+        if None not in scaled:
+            self.hits += len(scaled)
+            return scaled
+        for i, surf in enumerate(scaled):
+            if surf is None:
+                if len(table) >= self.max_entries:
+                    table.clear()
+                    self.flushes += 1
+                surf = table.get(surfaces[i])
+                if surf is None:
+                    surf = table[surfaces[i]] = self._resize(surfaces[i], scale)
+                    self.misses += 1
+                scaled[i] = surf
+            else:
+                self.hits += 1
+        return scaled
+
+    def _resize(self, surface, scale):
+        w, h = surface.get_size()
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        if surface.get_colorkey() is None and surface.get_bytesize() == 4:
+            return pygame.transform.smoothscale(surface, size)
+        # Colorkeyed or paletted: filtering would smear the key color
+        return pygame.transform.scale(surface, size)
+
+    def clear(self):
+        self.tables.clear()
+
+    def stats(self):
+        return {
+            'entries': sum(len(table) for table in self.tables.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'flushes': self.flushes,
+        }
+
+images = ImageRegistry()
+fonts = FontRegistry()
+rotations = RotationCache()
+flipbooks = FlipbookCache()
+scaled_images = ScaledImageCache()
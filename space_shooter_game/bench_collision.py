@@ -0,0 +1,76 @@
+import random
+import time
+import pygame
+from settings import *
+from collision import SpatialHash
+
+# Compares pygame's brute-force groupcollide/spritecollide with the spatial
+# hash broadphase on random layouts, checking both return identical results.
+# Run: python bench_collision.py
+
+class Box(pygame.sprite.Sprite):
+    def __init__(self, w, h):
+        super().__init__()
+        self.rect = pygame.Rect(random.randrange(0, SCREEN_WIDTH - w), random.randrange(0, SCREEN_HEIGHT - h), w, h)
+
+def make_world(n_mobs, n_bullets):
+    mobs = pygame.sprite.Group(Box(ENEMY_WIDTH, ENEMY_HEIGHT) for _ in range(n_mobs))
+    bullets = pygame.sprite.Group(Box(BULLET_WIDTH, BULLET_HEIGHT) for _ in range(n_bullets))
+    enemy_bullets = pygame.sprite.Group(Box(6, 15) for _ in range(n_bullets))
+    player = Box(PLAYER_WIDTH, PLAYER_HEIGHT)
+    return mobs, bullets, enemy_bullets, player
+
+def brute(mobs, bullets, enemy_bullets, player):
+    return (pygame.sprite.groupcollide(mobs, bullets, False, False),
+            pygame.sprite.spritecollide(player, enemy_bullets, False),
+            pygame.sprite.spritecollide(player, mobs, False))
+
+def hashed(grid, mobs, bullets, enemy_bullets, player):
+    grid.begin_frame()
+    return (grid.groupcollide(mobs, bullets, False, False),
+            grid.spritecollide(player, enemy_bullets, False),
+            grid.spritecollide(player, mobs, False))
+
+def check_kills(seed, n_mobs, n_bullets):
+    # Killing variants mutate the groups, so compare on two identical worlds
+    random.seed(seed)
+    mobs, bullets, _, player = make_world(n_mobs, n_bullets)
+    expected = pygame.sprite.groupcollide(mobs, bullets, False, True)
+    expected_left = [s.rect for s in bullets]
+    random.seed(seed)
+    mobs, bullets, _, player = make_world(n_mobs, n_bullets)
+    grid = SpatialHash(brute_limit=0)
+    grid.begin_frame()
+    got = grid.groupcollide(mobs, bullets, False, True)
+    as_rects = lambda hits: [(a.rect, [b.rect for b in bs]) for a, bs in hits.items()]
+    assert as_rects(got) == as_rects(expected), "kill semantics differ from pygame.sprite"
+    assert [s.rect for s in bullets] == expected_left
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main():
+    random.seed(1)
+    # brute_limit=0 forces the grid path so the comparison is meaningful
+    grid = SpatialHash(brute_limit=0)
+    print(f"cell size {grid.cell_size}px")
+    auto = SpatialHash()
+    print(f"{'mobs':>6} {'bullets':>8} {'brute ms':>10} {'hash ms':>10} {'speedup':>8} {'auto ms':>10}")
+    # Play stays under ~4k pairs (stress_waves: ~500 enemies, a few
+    # bullets); the grid wins from roughly 12-15k pairs
+    for n_mobs, n_bullets in [(10, 30), (40, 100), (500, 8), (60, 200), (150, 100), (100, 300),
+                              (200, 800), (400, 2000), (800, 4000)]:
+        world = make_world(n_mobs, n_bullets)
+        repeat = max(3, 2000 // (n_mobs + n_bullets))
+        brute_ms, expected = timed(lambda: brute(*world), repeat)
+        hash_ms, got = timed(lambda: hashed(grid, *world), repeat)
+        assert got == expected and list(got[0]) == list(expected[0]), "spatial hash result differs from pygame.sprite"
+        auto_ms, _ = timed(lambda: hashed(auto, *world), repeat)
+        check_kills(n_mobs, n_mobs, n_bullets)
+        print(f"{n_mobs:>6} {n_bullets:>8} {brute_ms:>10.3f} {hash_ms:>10.3f} {brute_ms / hash_ms:>7.1f}x {auto_ms:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+import os
+# No window or audio device; must be set before pygame initializes
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from settings import *
+from main import HUD, load_assets
+from world import World
+from waves import WaveManager, load_script
+from render import Renderer
+from vfx import ParticleSystem, Starfield
+from ui import AnimatedText, DebugOverlay, HealthBar, draw_neon_text, text_cache
+from enemy import Boss, Enemy, Meteor
+from rng import rng
+from profiler import profiler
+
+# Scenario benchmarks for the full frame (simulation tick + render) under the
+# dummy SDL driver. Each scenario is timed for --frames frames after a warmup,
+# then run again under tracemalloc to measure allocations.
+#
+#   python benchmark.py                          # all scenarios, JSON to stdout
+#   python benchmark.py -s boss_circle -s hud_text --frames 300
+#   python benchmark.py --output baseline.json
+#   python benchmark.py --baseline baseline.json # exit 1 on regression
+#   python benchmark.py --profile                # also report frame profiler phases
+#   python benchmark.py --render-scale 1 --render-scale 0.5  # each scenario per render scale
+
+class Scenario:
+    # Base scenario: waves are switched off and the player cannot die, so
+    # every frame exercises the same load. Subclasses set things up in
+    # setup() and keep the load topped up in step(), both counted as update
+    # time; draw() adds scenario-specific UI on top of the world.
+    name = None
+    description = ""
+
+    def setup(self, bench):
+        pass
+
+    def step(self, bench, frame):
+        pass
+
+    def input(self, bench, frame):
+        return 0, None
+
+    def draw(self, bench, screen):
+        bench.draw_hud(screen)
+
+class BossCircle(Scenario):
+    name = "boss_circle"
+    description = "boss firing attack_circle every 3 ticks (bullet hell)"
+
+    def setup(self, bench):
+        boss = Boss(bench.world.timers)
+        boss.rect.y = boss.target_y
+        boss.state = "FIGHTING"
+        bench.world.timers.cancel(boss.attack_timer) # Only the scripted volleys below
+        boss.hp = 10 ** 6 # The player's shots must not end the scenario
+        bench.world.boss = boss
+        bench.world.boss_active = True
+        bench.world.boss_group.add(boss)
+        bench.world.all_sprites.add(boss)
+
+    def step(self, bench, frame):
+        if frame % 3 == 0:
+            bench.world.boss.attack_circle(bench.world.enemy_bullets)
+
+class SpreadShot(Scenario):
+    name = "spread_3500"
+    description = "5-way rapid spread shot (score 3500+) into 40 enemies"
+
+    def setup(self, bench):
+        world = bench.world
+        world.score = 3500
+        world.player.bullet_count = 5
+        world.player.shoot_delay = SHOOT_COOLDOWN / 2
+
+    def step(self, bench, frame):
+        world = bench.world
+        while len(world.mobs) < 40:
+            enemy = Enemy(world.timers, world.score, enemy_type='tank')
+            enemy.hp = 10 ** 6 # Keep the targets alive
+            world.mobs.add(enemy)
+            world.all_sprites.add(enemy)
+
+    def input(self, bench, frame):
+        # Sweep the aim across the top of the screen
+        x = SCREEN_WIDTH / 2 + math.sin(frame / 30) * SCREEN_WIDTH / 2
+        return 0, (int(x), 100)
+
+class MeteorShower(Scenario):
+    name = "meteor_shower"
+    description = "200 meteors on screen"
+
+    def step(self, bench, frame):
+        world = bench.world
+        while len(world.meteors) < 200:
+            m = Meteor(world.timers)
+            m.rect.y = rng.meteor.randrange(-100, SCREEN_HEIGHT // 2)
+            world.meteors.add(m)
+            world.all_sprites.add(m)
+
+class ParticleStorm(Scenario):
+    name = "particle_storm"
+    description = "explosions keeping ~5000 particles alive"
+
+    def step(self, bench, frame):
+        particles = bench.particles
+        while len(particles) < 5000:
+            center = (rng.fx.randrange(SCREEN_WIDTH), rng.fx.randrange(SCREEN_HEIGHT))
+            particles.burst(center, rng.fx.choice([ORANGE, RED, CYAN, MAGENTA]), 100)
+
+class StressWaves(Scenario):
+    name = "stress_waves"
+    description = "waves from assets/waves/stress.json (1000-enemy swarm first)"
+
+    def setup(self, bench):
+        world = bench.world
+        world.wave_manager = WaveManager(world.clock, load_script(os.path.join(WAVE_DIR, "stress.json")))
+        world.next_boss_score = float('inf') # A boss would pause the waves
+
+class HudText(Scenario):
+    name = "hud_text"
+    description = "score changing every tick, pulsing titles, neon text and the F3 overlay"
+
+    def setup(self, bench):
+        assets = bench.assets
+        self.titles = [AnimatedText(f"TITLE {i}", assets['font_xl'], CYAN, SCREEN_WIDTH / 2, 120 + i * 90, pulse_speed=0.05 + i * 0.01)
+                       for i in range(4)]
+        self.overlay = DebugOverlay(assets['font_debug'])
+        self.overlay.add_source("text", text_cache.stats)
+        self.overlay.add_source("world", bench.world.summary)
+        self.overlay.toggle()
+
+    def step(self, bench, frame):
+        bench.world.score += 10
+        for title in self.titles:
+            title.update()
+
+    def draw(self, bench, screen):
+        bench.draw_hud(screen)
+        font = bench.assets['font_ui']
+        for title in self.titles:
+            title.draw(screen)
+        for i in range(6):
+            draw_neon_text(screen, f"COMBO x{(bench.frame // 7 + i) % 50}", font, YELLOW, 120, 150 + i * 40)
+        draw_neon_text(screen, f"FINAL SCORE: {bench.world.score}", bench.assets['font_large'], WHITE, SCREEN_WIDTH / 2, SCREEN_HEIGHT - 80)
+        self.overlay.draw(screen)
+
+SCENARIOS = {s.name: s for s in (BossCircle, SpreadShot, MeteorShower, ParticleStorm, StressWaves, HudText)}
+
+class Bench:
+    # The pieces of main() a frame needs, without the event loop or states
+    def __init__(self, screen, assets, scenario, seed, render_scale=RENDER_SCALE):
+        self.screen = screen
+        self.assets = assets
+        self.scenario = scenario
+        self.particles = ParticleSystem()
+        self.world = World(self.particles, interpolate=True)
+        self.world.reset(seed=seed)
+        self.world.wave_manager.update = lambda *args: None # Scenarios control spawning
+        self.stars = Starfield()
+        self.renderer = Renderer(assets, self.world, self.stars, self.particles, pygame.sprite.Group(), render_scale)
+        self.hud = HUD(assets)
+        self.health_bar = HealthBar(20, 20, 200, 20, max_value=PLAYER_LIVES, color=GREEN)
+        self.boss_health_bar = HealthBar(SCREEN_WIDTH//2 - 150, 60, 300, 20, max_value=BOSS_HP, color=PURPLE)
+        self.frame = 0
+        scenario.setup(self)
+
+    def update(self):
+        world = self.world
+        self.scenario.step(self, self.frame)
+        world.player.lives = PLAYER_LIVES # Invulnerable: the load must not end the run
+        world.game_over = False
+        self.world.clock.advance(SIM_STEP_MS)
+        world.update(*self.scenario.input(self, self.frame))
+        self.particles.update()
+        self.stars.update()
+        self.renderer.scroll()
+        self.hud.update_score(world.score)
+        self.hud.update_lives(world.player.lives)
+        if world.boss_active:
+            self.boss_health_bar.set_value(world.boss.hp)
+            self.boss_health_bar.update()
+        self.frame += 1
+
+    def render(self):
+        screen = self.screen
+        self.renderer.draw_world(screen, (0, 0), 0.5)
+        self.scenario.draw(self, screen)
+        pygame.display.flip()
+
+    def draw_hud(self, screen):
+        world = self.world
+        self.hud.draw(screen)
+        self.health_bar.draw(screen)
+        draw_neon_text(screen, world.wave_manager.get_info(), self.assets['font_ui'], WHITE, SCREEN_WIDTH//2, 20)
+        if world.boss_active:
+            self.boss_health_bar.draw(screen)
+            draw_neon_text(screen, "WARNING: BOSS APPROACHING", self.assets['font_ui'], RED, SCREEN_WIDTH/2, 40)
+
+    def counts(self):
+        world = self.world
+        return {
+            'sprites': len(world.all_sprites),
+            'enemy_bullets': len(world.enemy_bullets),
+            'particles': len(self.particles),
+        }
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'mean': round(sum(ordered) / len(ordered), 3),
+        'p50': round(percentile(ordered, 50), 3),
+        'p95': round(percentile(ordered, 95), 3),
+        'p99': round(percentile(ordered, 99), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+def run_scenario(screen, assets, name, frames, warmup, alloc_frames, seed, render_scale=RENDER_SCALE):
+    bench = Bench(screen, assets, SCENARIOS[name](), seed, render_scale)
+    for _ in range(warmup):
+        bench.update()
+        bench.render()
+
+    update_ms = []
+    render_ms = []
+    gc_before = sum(stat['collections'] for stat in gc.get_stats())
+    clock = time.perf_counter
+    for _ in range(frames):
+        t0 = clock()
+        profiler.begin_frame()
+        bench.update()
+        t1 = clock()
+        bench.render()
+        profiler.end_frame()
+        t2 = clock()
+        update_ms.append((t1 - t0) * 1000)
+        render_ms.append((t2 - t1) * 1000)
+    gc_runs = sum(stat['collections'] for stat in gc.get_stats()) - gc_before
+    load = bench.counts()
+    phases = {name: round(avg, 3) for name, avg, _ in profiler.averages(frames)}
+    profiler.set_enabled(False)
+    profiler.begin_frame()
+
+    # Allocations, measured separately since tracing skews the timings
+    tracemalloc.start()
+    start_mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for _ in range(alloc_frames):
+        bench.update()
+        bench.render()
+    after = tracemalloc.take_snapshot()
+    end_mem, peak_mem = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0)
+
+    return {
+        'description': SCENARIOS[name].description,
+        'render_scale': render_scale,
+        'frames': frames,
+        'frame_ms': summarize([u + r for u, r in zip(update_ms, render_ms)]),
+        'update_ms': summarize(update_ms),
+        'render_ms': summarize(render_ms),
+        'gc_collections': gc_runs,
+        'alloc': {
+            'frames': alloc_frames,
+            'net_kb': round((end_mem - start_mem) / 1024, 1),
+            'peak_kb': round((peak_mem - start_mem) / 1024, 1),
+            'grown_kb_per_frame': round(allocated / 1024 / max(1, alloc_frames), 2),
+        },
+        'load': load,
+        'phases_ms': phases,
+    }
+
+# Metrics compared against a baseline, and how much slower counts as a regression
+COMPARED = [('frame_ms', 'p50'), ('frame_ms', 'p95'), ('frame_ms', 'p99'), ('update_ms', 'mean'), ('render_ms', 'mean')]
+
+def compare(result, baseline, threshold):
+    # Returns (rows, regressions) with one row per scenario metric
+    rows = []
+    regressions = []
+    for name, current in result['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            rows.append((name, "(not in baseline)", None, None, None))
+            continue
+        for section, key in COMPARED:
+            old = base[section][key]
+            new = current[section][key]
+            ratio = new / old if old > 0 else 1.0
+            regressed = ratio > 1 + threshold
+            rows.append((name, f"{section}.{key}", old, new, ratio))
+            if regressed:
+                regressions.append(f"{name} {section}.{key}: {old} -> {new} ms ({ratio:.2f}x)")
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the frame-time benchmark scenarios.")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default all)")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="untimed frames before timing")
+    parser.add_argument("--alloc-frames", type=int, default=120, help="frames traced for allocations")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", metavar="PATH", help="also write the JSON result here (e.g. a new baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved result; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (default 0.15 = 15%%)")
+    parser.add_argument("--profile", action="store_true", help="time with the frame profiler on and report per-phase means")
+    parser.add_argument("--render-scale", type=float, action="append", metavar="S",
+                        help=f"render scale to time (repeatable, default {RENDER_SCALE:g}); "
+                             "results for scales other than 1 are keyed <scenario>@<S>x")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:15} {scenario.description}")
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    assets = load_assets()
+    scales = args.render_scale or [RENDER_SCALE]
+
+    result = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'sdl': ".".join(map(str, pygame.get_sdl_version())),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'video_driver': pygame.display.get_driver(),
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'profile': args.profile,
+            'render_scales': scales,
+        },
+        'scenarios': {},
+    }
+    for name in args.scenario or SCENARIOS:
+        for scale in scales:
+            key = name if scale == 1 else f"{name}@{scale:g}x"
+            print(f"running {key}...", file=sys.stderr)
+            profiler.set_enabled(args.profile)
+            result['scenarios'][key] = run_scenario(screen, assets, name, args.frames, args.warmup, args.alloc_frames,
+                                                    args.seed, scale)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if not args.baseline:
+        print(text)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, regressions = compare(result, baseline, args.threshold)
+    print(f"{'scenario':15} {'metric':16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metric, old, new, ratio in rows:
+        if ratio is None:
+            print(f"{name:15} {metric}")
+        else:
+            flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+            print(f"{name:15} {metric:16} {old:>10.3f} {new:>10.3f} {(ratio - 1) * 100:>+7.1f}%{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print("\nno regressions")
+
+if __name__ == "__main__":
+    main()
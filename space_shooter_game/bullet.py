@@ -1,39 +1,51 @@
 import pygame
-import os
 from settings import *
+from assets import images, rotations
+from pool import Pool, PooledSprite
+
+def _bullet_fallback(size):
+    surf = pygame.Surface(size)
+    surf.fill(BULLET_COLOR)
+    return surf
+
+class Bullet(PooledSprite):
+    UP = pygame.math.Vector2(0, -1)
 
-class Bullet(pygame.sprite.Sprite):
     def __init__(self, x, y, direction=None):
         super().__init__()
-        try:
-            image_path = os.path.join(IMAGE_DIR, "bullet.png")
-            self.image = pygame.image.load(image_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (BULLET_WIDTH, BULLET_HEIGHT))
-        except (FileNotFoundError, pygame.error):
-            self.image = pygame.Surface((BULLET_WIDTH, BULLET_HEIGHT))
-            self.image.fill(BULLET_COLOR)
-            
-        self.rect = self.image.get_rect()
-        self.rect.center = (x, y)
+        self.rect = pygame.Rect(0, 0, 0, 0)
         self.pos = pygame.math.Vector2(x, y)
+        self.velocity = pygame.math.Vector2()
         self.speed = BULLET_SPEED
+        self.reset(x, y, direction)
+
+    def reset(self, x, y, direction=None):
+        # Reinitialize in place (also used when reused from the pool)
+        self.image = Bullet.get_image()
+        size = self.image.get_size()
+        self.pos.update(x, y)
         
         if direction:
             # Normalize direction
-            if direction.length() > 0:
-                direction = direction.normalize()
-            self.velocity = direction * self.speed
+            self.velocity.update(direction)
+            if self.velocity.length_squared() > 0:
+                self.velocity.scale_to_length(self.speed)
             
             # Rotate image to align with direction
             # Original image points up (0, -1). 
             # We calculate angle between (0, -1) and our direction.
             # angle_to returns signed angle in degrees.
-            up = pygame.math.Vector2(0, -1)
-            angle = direction.angle_to(up)
-            self.image = pygame.transform.rotate(self.image, angle)
-            self.rect = self.image.get_rect(center=self.rect.center)
+            angle = self.velocity.angle_to(Bullet.UP)
+            self.image, size = rotations.get('bullet', self.image, angle)
         else:
-            self.velocity = pygame.math.Vector2(0, -self.speed)
+            self.velocity.update(0, -self.speed)
+
+        self.rect.size = size
+        self.rect.center = (x, y)
+
+    @staticmethod
+    def get_image():
+        return images.get("bullet.png", (BULLET_WIDTH, BULLET_HEIGHT), fallback=_bullet_fallback)
 
     def update(self):
         self.pos += self.velocity
@@ -45,3 +57,5 @@ class Bullet(pygame.sprite.Sprite):
             self.rect.right < 0 or 
             self.rect.left > SCREEN_WIDTH):
             self.kill()
+
+bullet_pool = Pool(Bullet, BULLET_POOL_SIZE, BULLET_POOL_MAX)
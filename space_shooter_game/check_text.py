@@ -0,0 +1,87 @@
+import os
+# No window needed; must be set before pygame initializes
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import random
+import pygame
+from settings import *
+from assets import fonts
+from ui import TextCache, draw_neon_text
+
+# Checks that cached neon text (ui.TextCache) looks the same as the direct
+# per-frame blits it replaced, on random backgrounds with every game font.
+# Compositing once instead of blending five times rounds differently, so
+# channels may differ by a few levels; a double-applied glow alpha shows up
+# as differences of tens of levels (64 before the premultiplied cache).
+# Run: python check_text.py
+
+TOLERANCE = 5 # Max per-channel difference (of 255); measured 4
+SAMPLES = ["SCORE: 0123456789", "WARNING: BOSS APPROACHING", "PAUSED", "Wave 12 - Endless"]
+COLORS = [(WHITE, None), (YELLOW, None), (CYAN, NEON_PINK), (RED, NEON_GREEN)]
+
+def draw_direct(surface, text, font, color, x, y, align="center", glow_color=None):
+    # draw_neon_text before the cache: four glow blits, then the text
+    if glow_color is None:
+        glow_color = color
+    for offset in TextCache.GLOW_OFFSETS:
+        glow_surf = font.render(text, True, glow_color)
+        glow_rect = glow_surf.get_rect()
+        if align == "center":
+            glow_rect.center = (x + offset[0], y + offset[1])
+        elif align == "nw":
+            glow_rect.topleft = (x + offset[0], y + offset[1])
+        elif align == "ne":
+            glow_rect.topright = (x + offset[0], y + offset[1])
+        glow_surf.set_alpha(TextCache.GLOW_ALPHA)
+        surface.blit(glow_surf, glow_rect)
+    text_surface = font.render(text, True, color)
+    text_rect = text_surface.get_rect()
+    if align == "nw":
+        text_rect.topleft = (x, y)
+    elif align == "ne":
+        text_rect.topright = (x, y)
+    elif align == "center":
+        text_rect.center = (x, y)
+    surface.blit(text_surface, text_rect)
+    return text_rect
+
+def noise(size):
+    surf = pygame.Surface(size)
+    for y in range(0, size[1], 4):
+        for x in range(0, size[0], 4):
+            surf.fill((random.randrange(256), random.randrange(256), random.randrange(256)), (x, y, 4, 4))
+    return surf
+
+def max_difference(a, b):
+    worst = 0
+    for y in range(a.get_height()):
+        for x in range(a.get_width()):
+            pa, pb = a.get_at((x, y)), b.get_at((x, y))
+            worst = max(worst, abs(pa.r - pb.r), abs(pa.g - pb.g), abs(pa.b - pb.b))
+    return worst
+
+def main():
+    random.seed(1)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    fonts.load_all()
+    worst = 0
+    for name in FONTS:
+        font = fonts.get(name)
+        for text in SAMPLES:
+            for color, glow_color in COLORS:
+                for align in ("center", "nw", "ne"):
+                    size = (font.size(text)[0] + 20, font.get_height() + 20)
+                    x, y = {"center": (size[0] // 2, size[1] // 2), "nw": (10, 10), "ne": (size[0] - 10, 10)}[align]
+                    background = noise(size)
+                    direct, cached = background.copy(), background.copy()
+                    expected = draw_direct(direct, text, font, color, x, y, align, glow_color)
+                    got = draw_neon_text(cached, text, font, color, x, y, align, glow_color)
+                    assert got == expected, f"{name} {text!r} {align}: rect {got} != {expected}"
+                    diff = max_difference(direct, cached)
+                    assert diff <= TOLERANCE, f"{name} {text!r} {color}/{glow_color} {align}: off by {diff}"
+                    worst = max(worst, diff)
+    print(f"cached neon text matches direct blits (max channel difference {worst})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import pygame
+from settings import *
+
+class SpatialHash:
+    # Uniform-grid broadphase shared by every collision query in a frame.
+    # Call begin_frame() once after all updates; the grid for a group is then
+    # built the first time that group is queried and reused by every later
+    # query that frame (the player's bullets are hit-tested against enemies,
+    # meteors and the boss from one grid).
+    #
+    # spritecollide/groupcollide match pygame.sprite's functions exactly: same
+    # hit sets, results in group iteration order, and sprites killed by an
+    # earlier query are skipped by later ones. Sprites added to a group after
+    # its grid was built are not seen until the next frame. Small queries,
+    # where pygame's C loop is already cheaper than building a grid, are
+    # passed straight to pygame.sprite. That is every query in normal play
+    # (see COLLISION_BRUTE_LIMIT): the grid only pays off in stress loads
+    # with hundreds of enemies and bullets at once, and costs one size
+    # check per query otherwise.
+    def __init__(self, cell_size=COLLISION_CELL_SIZE, brute_limit=COLLISION_BRUTE_LIMIT):
+        self.cell_size = cell_size
+        self.brute_limit = brute_limit
+        self.grids = {}
+        self.grid_builds = 0
+        self.hashed_queries = 0
+        self.brute_queries = 0
+
+    def begin_frame(self):
+        if self.grids:
+            self.grids = {}
+
+    def _grid(self, group):
+        grid = self.grids.get(group)
+        if grid is not None:
+            return grid
+
+        # Each cell holds parallel lists of (order, sprite) and rects so the
+        # narrow phase can run in C via Rect.collidelistall
+        self.grid_builds += 1
+        grid = {}
+        cs = self.cell_size
+        for order, sprite in enumerate(group):
+            rect = sprite.rect
+            entry = (order, sprite)
+            x0 = rect.left // cs
+            y0 = rect.top // cs
+            x1 = max(rect.right - 1, rect.left) // cs
+            y1 = max(rect.bottom - 1, rect.top) // cs
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = grid.get((cx, cy))
+                    if cell is None:
+                        grid[(cx, cy)] = ([entry], [rect])
+                    else:
+                        cell[0].append(entry)
+                        cell[1].append(rect)
+        self.grids[group] = grid
+        return grid
+
+    def _query(self, grid, rect, group):
+        cs = self.cell_size
+        x0 = rect.left // cs
+        y0 = rect.top // cs
+        x1 = max(rect.right - 1, rect.left) // cs
+        y1 = max(rect.bottom - 1, rect.top) // cs
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = grid.get((cx, cy))
+                if cell is not None:
+                    entries = cell[0]
+                    for i in rect.collidelistall(cell[1]):
+                        order, sprite = entries[i]
+                        found[order] = sprite
+        if not found:
+            return []
+        # Skip sprites killed earlier this frame; restore group order
+        return [found[order] for order in sorted(found) if group.has_internal(found[order])]
+
+    def spritecollide(self, sprite, group, dokill):
+        grid = self.grids.get(group)
+        if grid is None:
+            # A one-off query is a single C pass; only use a grid already built
+            self.brute_queries += 1
+            return pygame.sprite.spritecollide(sprite, group, dokill)
+
+        self.hashed_queries += 1
+        hits = self._query(grid, sprite.rect, group)
+        if dokill:
+            for s in hits:
+                s.kill()
+        return hits
+
+    def groupcollide(self, groupa, groupb, dokilla, dokillb):
+        if groupb not in self.grids and len(groupa) * len(groupb) <= self.brute_limit:
+            self.brute_queries += 1
+            return pygame.sprite.groupcollide(groupa, groupb, dokilla, dokillb)
+
+        self.hashed_queries += 1
+        grid = self._grid(groupb)
+        crashed = {}
+        for a in groupa.sprites():
+            collision = self._query(grid, a.rect, groupb)
+            if collision:
+                crashed[a] = collision
+                if dokillb:
+                    for b in collision:
+                        b.kill()
+                if dokilla:
+                    a.kill()
+        return crashed
+
+    def stats(self):
+        return {
+            'grids': self.grid_builds,
+            'hashed': self.hashed_queries,
+            'brute': self.brute_queries,
+        }
@@ -0,0 +1,117 @@
+import pygame
+from settings import *
+
+# Controllers turn some input source into the player's command for one
+# simulation tick: get_input(world) returns (move, target_pos) where move is
+# -1 / 0 / 1 and target_pos is the aim point (None fires straight up).
+
+class KeyboardController:
+    # Arrow keys to move, mouse to aim (the interactive game)
+    def get_input(self, world):
+        keys = pygame.key.get_pressed()
+        move = 0
+        if keys[pygame.K_LEFT]:
+            move -= 1
+        if keys[pygame.K_RIGHT]:
+            move += 1
+        return move, pygame.mouse.get_pos()
+
+class IdleController:
+    # Never moves, fires straight up
+    def get_input(self, world):
+        return 0, None
+
+class ScriptedController:
+    # Plays back a list of (duration_ms, move, target_pos) steps against the
+    # game clock, looping at the end.
+    def __init__(self, steps, loop=True):
+        self.steps = steps
+        self.loop = loop
+        self.total = sum(step[0] for step in steps)
+
+    def get_input(self, world):
+        t = world.clock.get_ticks()
+        if self.loop:
+            t %= self.total
+        for duration, move, target in self.steps:
+            if t < duration:
+                return move, target
+            t -= duration
+        return 0, None
+
+    @classmethod
+    def sweep(cls, period=2000):
+        # Drift from wall to wall, firing straight up
+        return cls([(period, -1, None), (period, 1, None)])
+
+class BotController:
+    # Simple autopilot for balancing runs. Each tick it extrapolates nearby
+    # threats (enemy bullets, mobs, meteors) from their last movement, scores
+    # moving left / staying / moving right by how soon each would get hit over
+    # a short horizon, and takes the safest one, breaking ties towards the
+    # lowest enemy (or the boss), which it also aims at.
+    def __init__(self, horizon=45, sample_every=5, look_above=300):
+        self.horizon = horizon
+        self.sample_every = sample_every
+        self.look_above = look_above
+        self.last_pos = {}
+        self.last_move = 0
+
+    def get_input(self, world):
+        player = world.player.rect
+        speed = world.player.speed
+
+        threats = []
+        seen = {}
+        for group in (world.enemy_bullets, world.mobs, world.meteors):
+            for sprite in group:
+                r = sprite.rect
+                last = self.last_pos.get(sprite)
+                seen[sprite] = r.center
+                if player.top - r.bottom > self.look_above or r.top > player.bottom:
+                    continue
+                if last is None:
+                    vx, vy = 0, 2
+                else:
+                    vx, vy = r.centerx - last[0], r.centery - last[1]
+                threats.append((r, vx, vy))
+        self.last_pos = seen
+
+        target = None
+        for boss in world.boss_group:
+            target = boss.rect
+        if target is None:
+            lowest = -1
+            for group in (world.mobs, world.meteors):
+                for sprite in group:
+                    if 0 <= sprite.rect.bottom and sprite.rect.bottom > lowest:
+                        lowest = sprite.rect.bottom
+                        target = sprite.rect
+
+        preferred = 0
+        if target is not None and abs(target.centerx - player.centerx) > speed:
+            preferred = 1 if target.centerx > player.centerx else -1
+
+        # Once dodging, stick with the current direction on ties so the bot
+        # commits to one side instead of jittering under a wide meteor
+        move = preferred
+        if self.danger(player, preferred * speed, threats):
+            best = None
+            for candidate in (self.last_move, 0, -1, 1):
+                danger = self.danger(player, candidate * speed, threats)
+                if best is None or danger < best:
+                    best = danger
+                    move = candidate
+        self.last_move = move
+
+        return move, target.center if target is not None else None
+
+    def danger(self, player, dx, threats):
+        total = 0
+        for t in range(self.sample_every, self.horizon + 1, self.sample_every):
+            x = min(max(player.x + dx * t, 0), SCREEN_WIDTH - player.width)
+            future = pygame.Rect(x, player.y, player.width, player.height)
+            for r, vx, vy in threats:
+                if future.colliderect(r.move(vx * t, vy * t)):
+                    total += self.horizon - t + 1 # sooner hits weigh more
+        return total
@@ -2,7 +2,7 @@ import pygame
 import sys
 import traceback
 from settings import *
-from vfx import Particle, Star
+from vfx import ParticleSystem, Starfield
 
 try:
     pygame.init()
@@ -14,13 +14,15 @@ try:
     print(f"Orange with alpha: {c}")
     pygame.draw.circle(screen, c, (10, 10), 5)
     
-    print("Testing Particle...")
-    p = Particle([], (100, 100), CYAN, 5, 5)
+    print("Testing ParticleSystem...")
+    p = ParticleSystem()
+    p.emit((100, 100), CYAN, 5, 5)
+    p.burst((200, 200), ORANGE, 20)
     p.update()
     p.draw(screen)
     
-    print("Testing Star...")
-    s = Star([])
+    print("Testing Starfield...")
+    s = Starfield()
     s.update()
     s.draw(screen)
     
@@ -1,15 +1,53 @@
 import pygame
-import random
-import os
 import math
 from settings import *
+from assets import images, rotations, flipbooks
+from rng import rng
+from pool import Pool, PooledSprite
 
-class EnemyBullet(pygame.sprite.Sprite):
+# Per-type size and fallback color
+ENEMY_LOOKS = {
+    'basic': ((ENEMY_WIDTH, ENEMY_HEIGHT), RED),
+    'shooter': ((ENEMY_WIDTH, ENEMY_HEIGHT), ORANGE),
+    'chaser': ((ENEMY_WIDTH, ENEMY_HEIGHT), PURPLE),
+    'tank': ((int(ENEMY_WIDTH * 1.5), int(ENEMY_HEIGHT * 1.5)), (100, 100, 100)), # Gray
+}
+
+def _solid_fallback(color):
+    def build(size):
+        surf = pygame.Surface(size)
+        surf.fill(color)
+        return surf
+    return build
+
+def _meteor_fallback(size):
+    w, h = size
+    surf = pygame.Surface(size)
+    surf.fill(METEOR_COLOR)
+    # Draw some crater details
+    pygame.draw.circle(surf, (100, 50, 10), (w//3, h//3), w//6)
+    pygame.draw.circle(surf, (100, 50, 10), (w - w//3, h - h//3), w//5)
+    return surf
+
+def _boss_fallback(size):
+    width, height = size
+    surf = pygame.Surface(size)
+    surf.fill(BOSS_COLOR)
+    # Draw some "eyes"
+    pygame.draw.rect(surf, YELLOW, (20, 50, 20, 20))
+    pygame.draw.rect(surf, YELLOW, (width-40, 50, 20, 20))
+    return surf
+
+class EnemyBullet(PooledSprite):
     def __init__(self, x, y, dx=0, dy=1, speed=None):
         super().__init__()
-        self.image = pygame.Surface((6, 15))
-        self.image.fill(RED)
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, dx, dy, speed)
+
+    def reset(self, x, y, dx=0, dy=1, speed=None):
+        # Reinitialize in place (also used when reused from the pool)
+        self.image = EnemyBullet.get_image()
+        self.rect.size = self.image.get_size()
         self.rect.centerx = x
         self.rect.top = y
         self.dx = dx
@@ -19,7 +57,11 @@ class EnemyBullet(pygame.sprite.Sprite):
         # Rotate image if moving sideways significantly
         if dx != 0:
             angle = -math.degrees(math.atan2(dy, dx)) - 90
-            self.image = pygame.transform.rotate(self.image, angle)
+            self.image, _ = rotations.get('enemy_bullet', self.image, angle)
+
+    @staticmethod
+    def get_image():
+        return images.get("enemy_bullet.png", (6, 15), fallback=_solid_fallback(RED))
 
     def update(self):
         self.rect.x += self.dx * self.speed
@@ -31,15 +73,26 @@ class EnemyBullet(pygame.sprite.Sprite):
             self.rect.left > SCREEN_WIDTH):
             self.kill()
 
+enemy_bullet_pool = Pool(EnemyBullet, ENEMY_BULLET_POOL_SIZE, ENEMY_BULLET_POOL_MAX)
+
+def fire_enemy_bullet(group, x, y, dx=0, dy=1, speed=None):
+    # At the pool's cap the shot is dropped (see Pool)
+    bullet = enemy_bullet_pool.acquire(x, y, dx, dy, speed)
+    if bullet is not None:
+        group.add(bullet)
+
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, score_factor=0, enemy_type=None):
+    # `timers` is the World's TimerWheel (as for Meteor, Boss and Player)
+    def __init__(self, timers, score_factor=0, enemy_type=None):
         super().__init__()
+        self.timers = timers
+        self.shot_timer = None
         
         # Determine Type
         if enemy_type:
             self.type = enemy_type
         else:
-            roll = random.random()
+            roll = rng.enemy.random()
             if roll < 0.6: self.type = 'basic'
             elif roll < 0.8: self.type = 'shooter'
             elif roll < 0.9: self.type = 'chaser'
@@ -48,60 +101,42 @@ class Enemy(pygame.sprite.Sprite):
         # Default Attributes
         self.hp = 1
         speed_multiplier = 1 + (score_factor * 0.005)
-        base_speed = random.uniform(ENEMY_SPEED_MIN, ENEMY_SPEED_MAX)
+        base_speed = rng.enemy.uniform(ENEMY_SPEED_MIN, ENEMY_SPEED_MAX)
 
         # Type Specifics
-        width, height = ENEMY_WIDTH, ENEMY_HEIGHT
-        color = RED
+        (width, height), _ = ENEMY_LOOKS[self.type]
         
         if self.type == 'basic':
             pass # Defaults are fine
             
         elif self.type == 'shooter':
-            color = ORANGE
-            self.last_shot = pygame.time.get_ticks()
             self.shoot_delay = 2000 # 2 seconds
+            self.loaded = False # Set by the timer once shoot_delay has passed
+            self.shot_timer = self.timers.after(self.shoot_delay, self.reload)
             
         elif self.type == 'chaser':
-            color = PURPLE
             base_speed *= 1.5
             
         elif self.type == 'tank':
-            color = (100, 100, 100) # Gray
-            width, height = int(ENEMY_WIDTH * 1.5), int(ENEMY_HEIGHT * 1.5)
             self.hp = 5
             base_speed *= 0.5
 
-        # Image Handling
-        try:
-            filename = f"enemy_{self.type}.png" if self.type != 'basic' else "enemy.png"
-            image_path = os.path.join(IMAGE_DIR, filename)
-            # Check if file exists, otherwise fallback
-            if os.path.exists(image_path):
-                 self.image = pygame.image.load(image_path).convert_alpha()
-                 self.image = pygame.transform.scale(self.image, (width, height))
-            else:
-                 # Fallback to creating a colored rect if specific image missing
-                 if self.type == 'basic':
-                     # Try generic enemy.png again
-                     image_path = os.path.join(IMAGE_DIR, "enemy.png")
-                     if os.path.exists(image_path):
-                         self.image = pygame.image.load(image_path).convert_alpha()
-                         self.image = pygame.transform.scale(self.image, (width, height))
-                     else: raise FileNotFoundError
-                 else: raise FileNotFoundError
-        except (FileNotFoundError, pygame.error):
-            self.image = pygame.Surface((width, height))
-            self.image.fill(color)
+        self.image = Enemy.get_image(self.type)
             
         self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(0, SCREEN_WIDTH - width)
-        self.rect.y = random.randrange(-150, -50)
+        self.rect.x = rng.enemy.randrange(0, SCREEN_WIDTH - width)
+        self.rect.y = rng.enemy.randrange(-150, -50)
         
         self.pos_x = float(self.rect.x)
         self.pos_y = float(self.rect.y)
         self.speed = base_speed * speed_multiplier
 
+    @staticmethod
+    def get_image(enemy_type):
+        size, color = ENEMY_LOOKS[enemy_type]
+        filename = f"enemy_{enemy_type}.png" if enemy_type != 'basic' else "enemy.png"
+        return images.get(filename, size, fallback=_solid_fallback(color))
+
     def update(self, player_rect=None, enemy_bullets_group=None):
         # Y Movement
         self.pos_y += self.speed
@@ -115,12 +150,10 @@ class Enemy(pygame.sprite.Sprite):
                 self.pos_x -= 1
         
         # Shooting (Shooter)
-        if self.type == 'shooter' and enemy_bullets_group:
-            now = pygame.time.get_ticks()
-            if now - self.last_shot > self.shoot_delay:
-                self.last_shot = now
-                bullet = EnemyBullet(self.rect.centerx, self.rect.bottom)
-                enemy_bullets_group.add(bullet)
+        if self.type == 'shooter' and self.loaded and enemy_bullets_group:
+            self.loaded = False
+            fire_enemy_bullet(enemy_bullets_group, self.rect.centerx, self.rect.bottom)
+            self.shot_timer = self.timers.after(self.shoot_delay, self.reload)
 
         self.rect.x = int(self.pos_x)
         self.rect.y = int(self.pos_y)
@@ -128,80 +161,78 @@ class Enemy(pygame.sprite.Sprite):
         if self.rect.top > SCREEN_HEIGHT + 10:
             self.kill()
 
+    def reload(self):
+        self.loaded = True
+
+    def kill(self):
+        self.timers.cancel(self.shot_timer)
+        super().kill()
+
     def take_damage(self, amount):
         self.hp -= amount
         return self.hp <= 0
 
 class Meteor(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, timers):
         super().__init__()
-        # Random size
-        size = random.randint(METEOR_MIN_SIZE, METEOR_MAX_SIZE)
+        self.timers = timers
+        # Random size, snapped to a bucket so meteors share rotation frames
+        size = Meteor.size_bucket(rng.meteor.randint(METEOR_MIN_SIZE, METEOR_MAX_SIZE))
         
-        # Image
-        try:
-             image_path = os.path.join(IMAGE_DIR, "meteor.png")
-             if os.path.exists(image_path):
-                 self.image = pygame.image.load(image_path).convert_alpha()
-                 self.image = pygame.transform.scale(self.image, (size, size))
-             else: raise FileNotFoundError
-        except:
-             self.image = pygame.Surface((size, size))
-             self.image.fill(METEOR_COLOR)
-             # Draw some crater details
-             pygame.draw.circle(self.image, (100, 50, 10), (size//3, size//3), size//6)
-             pygame.draw.circle(self.image, (100, 50, 10), (size - size//3, size - size//3), size//5)
-        
-        self.original_image = self.image
+        self.frames = Meteor.get_frames(size)
+        self.image = self.frames[0].image
         self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(0, SCREEN_WIDTH - size)
-        self.rect.y = random.randrange(-150, -100)
+        self.rect.x = rng.meteor.randrange(0, SCREEN_WIDTH - size)
+        self.rect.y = rng.meteor.randrange(-150, -100)
         
-        self.speed_y = random.randint(METEOR_MIN_SPEED, METEOR_MAX_SPEED)
-        self.speed_x = random.uniform(-1, 1)
+        self.speed_y = rng.meteor.randint(METEOR_MIN_SPEED, METEOR_MAX_SPEED)
+        self.speed_x = rng.meteor.uniform(-1, 1)
         
         self.rot = 0
-        self.rot_speed = random.randint(-5, 5)
-        self.last_update = pygame.time.get_ticks()
+        self.rot_speed = rng.meteor.randint(-5, 5)
+        # Step the rotation every 50ms; meteors that don't spin need no timer
+        self.spin_timer = timers.every(50, self.rotate) if self.rot_speed else None
 
-    def update(self, *args):
-        # Rotate
-        now = pygame.time.get_ticks()
-        if now - self.last_update > 50:
-            self.last_update = now
-            self.rot = (self.rot + self.rot_speed) % 360
-            self.image = pygame.transform.rotate(self.original_image, self.rot)
-            old_center = self.rect.center
-            self.rect = self.image.get_rect()
-            self.rect.center = old_center
+    @staticmethod
+    def size_bucket(size):
+        steps = round((size - METEOR_MIN_SIZE) / METEOR_SIZE_BUCKET)
+        return min(METEOR_MAX_SIZE, METEOR_MIN_SIZE + steps * METEOR_SIZE_BUCKET)
+
+    @staticmethod
+    def get_image(size):
+        return images.get("meteor.png", (size, size), fallback=_meteor_fallback)
 
+    @staticmethod
+    def get_frames(size):
+        return flipbooks.get("meteor.png", size, Meteor.get_image(size))
+
+    def rotate(self):
+        self.rot = (self.rot + self.rot_speed) % 360
+        frame = self.frames[flipbooks.index(self.rot)]
+        cx, cy = self.rect.center
+        self.image = frame.image
+        self.rect.size = frame.size
+        self.rect.topleft = (cx - frame.offset[0], cy - frame.offset[1])
+
+    def update(self, *args):
         self.rect.y += self.speed_y
         self.rect.x += self.speed_x
         
         if self.rect.top > SCREEN_HEIGHT + 10 or self.rect.right < -20 or self.rect.left > SCREEN_WIDTH + 20:
              self.kill()
 
+    def kill(self):
+        self.timers.cancel(self.spin_timer)
+        super().kill()
+
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, hp_override=None):
+    def __init__(self, timers, hp_override=None):
         super().__init__()
+        self.timers = timers
         self.hp = hp_override if hp_override else BOSS_HP
         self.max_hp = self.hp
         
-        width, height = BOSS_WIDTH, BOSS_HEIGHT
-        
-        # Try to load boss image or fallback
-        try:
-             image_path = os.path.join(IMAGE_DIR, "boss.png")
-             if os.path.exists(image_path):
-                 self.image = pygame.image.load(image_path).convert_alpha()
-                 self.image = pygame.transform.scale(self.image, (width, height))
-             else: raise FileNotFoundError
-        except:
-             self.image = pygame.Surface((width, height))
-             self.image.fill(BOSS_COLOR)
-             # Draw some "eyes"
-             pygame.draw.rect(self.image, YELLOW, (20, 50, 20, 20))
-             pygame.draw.rect(self.image, YELLOW, (width-40, 50, 20, 20))
+        self.image = Boss.get_image()
         
         self.rect = self.image.get_rect()
         self.rect.centerx = SCREEN_WIDTH // 2
@@ -211,8 +242,13 @@ class Boss(pygame.sprite.Sprite):
         self.target_y = 50
         self.speed_x = BOSS_SPEED
         
-        self.last_attack_time = pygame.time.get_ticks()
         self.attack_cooldown = 2000 # 2 seconds between patterns
+        self.attack_ready = False # Set by the timer; attacks wait until FIGHTING
+        self.attack_timer = timers.after(self.attack_cooldown, self.reload)
+
+    @staticmethod
+    def get_image():
+        return images.get("boss.png", (BOSS_WIDTH, BOSS_HEIGHT), fallback=_boss_fallback)
 
     def update(self, enemy_bullets_group):
         if self.state == "ENTERING":
@@ -227,10 +263,10 @@ class Boss(pygame.sprite.Sprite):
                 self.speed_x *= -1
                 
             # Attacks
-            now = pygame.time.get_ticks()
-            if now - self.last_attack_time > self.attack_cooldown:
-                self.last_attack_time = now
-                pattern = random.choice(['spread', 'sweep', 'circle'])
+            if self.attack_ready:
+                self.attack_ready = False
+                self.attack_timer = self.timers.after(self.attack_cooldown, self.reload)
+                pattern = rng.boss.choice(['spread', 'sweep', 'circle'])
                 
                 if pattern == 'spread':
                     self.attack_spread(enemy_bullets_group)
@@ -239,6 +275,13 @@ class Boss(pygame.sprite.Sprite):
                 elif pattern == 'circle':
                     self.attack_circle(enemy_bullets_group)
 
+    def reload(self):
+        self.attack_ready = True
+
+    def kill(self):
+        self.timers.cancel(self.attack_timer)
+        super().kill()
+
     def attack_spread(self, group):
         # 5 bullets in a cone
         start_x = self.rect.centerx
@@ -246,7 +289,7 @@ class Boss(pygame.sprite.Sprite):
         for i in range(-2, 3): # -2, -1, 0, 1, 2
             dx = i * 0.3
             dy = 1
-            group.add(EnemyBullet(start_x, start_y, dx, dy, speed=6))
+            fire_enemy_bullet(group, start_x, start_y, dx, dy, speed=6)
 
     def attack_sweep(self, group):
         # Just fire rapidly across?
@@ -255,9 +298,9 @@ class Boss(pygame.sprite.Sprite):
         start_y = self.rect.bottom
         # We can't do a time-based sweep easily without state, so let's do a static "shotgun" blast
         for i in range(10):
-            dx = random.uniform(-1, 1)
-            dy = random.uniform(0.5, 1.5)
-            group.add(EnemyBullet(start_x, start_y, dx, dy, speed=7))
+            dx = rng.boss.uniform(-1, 1)
+            dy = rng.boss.uniform(0.5, 1.5)
+            fire_enemy_bullet(group, start_x, start_y, dx, dy, speed=7)
 
     def attack_circle(self, group):
         start_x = self.rect.centerx
@@ -268,7 +311,7 @@ class Boss(pygame.sprite.Sprite):
             rad = math.radians(angle)
             dx = math.cos(rad)
             dy = math.sin(rad)
-            group.add(EnemyBullet(start_x, start_y, dx, dy, speed=5))
+            fire_enemy_bullet(group, start_x, start_y, dx, dy, speed=5)
 
     def take_damage(self, amount):
         self.hp -= amount
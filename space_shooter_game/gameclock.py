@@ -0,0 +1,18 @@
+class GameClock:
+    # Simulation time in milliseconds. Gameplay code reads get_ticks() from
+    # here instead of pygame.time.get_ticks(), so time only moves when the
+    # loop advances it: by a fixed SIM_STEP_MS per simulation tick, both in
+    # the window and headless (which can then go as fast as the CPU allows),
+    # so seeded runs and replays are deterministic.
+    # Each World owns one and hands it to whatever needs it.
+    def __init__(self):
+        self.ticks = 0
+
+    def get_ticks(self):
+        return self.ticks
+
+    def advance(self, ms):
+        self.ticks += ms
+
+    def reset(self):
+        self.ticks = 0
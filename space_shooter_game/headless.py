@@ -0,0 +1,133 @@
+import os
+# No window or audio device; must be set before pygame initializes
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import time
+import pygame
+from settings import *
+from world import World, prefill_pools
+from waves import WaveScriptError, load_script
+from controllers import BotController, IdleController, ScriptedController
+from replay import ReplayWriter, state_digest, play
+from rng import rng
+
+# Runs the simulation (waves, enemies, boss, collisions, scoring) with no
+# window and no frame cap, driven by a bot or scripted controller. Each tick
+# advances the game clock by the same fixed step the windowed game uses, so
+# gameplay matches it exactly while running as fast as the CPU allows.
+#
+#   python headless.py --minutes 60 --controller bot --seed 1
+#   python headless.py --ticks 100000 --controller sweep --restart --json
+#   python headless.py --seed 7 --record runs/bot7.replay
+#   python headless.py --replay replays/last_run.replay
+#   python headless.py --waves assets/waves/stress.json --report 600
+
+CONTROLLERS = {
+    'bot': BotController,
+    'idle': IdleController,
+    'sweep': ScriptedController.sweep,
+}
+
+def run(max_ticks, controller, seed, restart=False, report_every=0, record=None, wave_script=WAVE_SCRIPT):
+    # Run i (after restarts) uses seed + i; `record` saves the first run as a replay
+    pygame.init()
+    prefill_pools()
+    world = World(wave_script=wave_script)
+    world.reset(seed=seed)
+    writer = ReplayWriter(record, world.seed) if record else None
+    tick_ms = SIM_STEP_MS
+    runs = []
+    total_ticks = 0
+
+    start = time.perf_counter()
+    last_report = start
+    while total_ticks < max_ticks:
+        world.clock.advance(tick_ms)
+        move, target_pos = controller.get_input(world)
+        if writer:
+            writer.record(move, target_pos)
+        world.update(move, target_pos)
+        total_ticks += 1
+
+        if world.game_over:
+            runs.append(dict(world.summary(), seed=world.seed))
+            if writer:
+                writer.close(state_digest(world))
+                writer = None
+            if not restart:
+                break
+            world.reset(seed=seed + len(runs))
+
+        if report_every and total_ticks % report_every == 0:
+            now = time.perf_counter()
+            print(f"tick {total_ticks}: {report_every / (now - last_report):.0f} ticks/s, score {world.score}, "
+                  f"mobs {len(world.mobs) + len(world.meteors)}, enemy bullets {len(world.enemy_bullets)}")
+            last_report = now
+
+    wall = time.perf_counter() - start
+    if not world.game_over:
+        runs.append(dict(world.summary(), seed=world.seed))
+    if writer:
+        writer.close(state_digest(world))
+    return {
+        'ticks': total_ticks,
+        'sim_seconds': round(total_ticks * tick_ms / 1000, 1),
+        'wall_seconds': round(wall, 3),
+        'ticks_per_second': round(total_ticks / wall) if wall > 0 else None,
+        'speedup': round(total_ticks / wall / SIM_RATE, 1) if wall > 0 else None,
+        'runs': runs,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game simulation headless and fast-forwarded.")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--ticks", type=int, help="simulation ticks to run")
+    limit.add_argument("--minutes", type=float, help="simulated minutes to run (default 10)")
+    parser.add_argument("--controller", choices=sorted(CONTROLLERS), default='bot')
+    parser.add_argument("--seed", type=int, default=None, help="run seed (default: random, printed with the results)")
+    parser.add_argument("--restart", action="store_true", help="start a new game after each game over")
+    parser.add_argument("--report", type=int, default=0, metavar="TICKS", help="print progress every TICKS ticks")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--record", metavar="PATH", help="save the (first) run as a replay")
+    parser.add_argument("--replay", metavar="PATH", help="fast-forward a replay and verify it reproduces the run")
+    parser.add_argument("--waves", default=WAVE_SCRIPT, metavar="PATH",
+                        help="wave script to play (default assets/waves/default.json)")
+    args = parser.parse_args()
+    try:
+        load_script(args.waves)
+    except WaveScriptError as e:
+        parser.error(str(e))
+
+    if args.replay:
+        pygame.init()
+        result = play(args.replay, World(wave_script=args.waves))
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        status = {True: "verified", False: "MISMATCH", None: "no digest to verify"}[result['verified']]
+        print(f"replay {args.replay} (seed {result['seed']}): {result['ticks']} ticks in {result['wall_seconds']}s, "
+              f"{result['ticks_per_second']} ticks/s, score {result['score']}, {status}")
+        if result['verified'] is False:
+            raise SystemExit(1)
+        return
+
+    seed = args.seed if args.seed is not None else rng.new_seed()
+    max_ticks = args.ticks if args.ticks else int((args.minutes or 10) * 60 * SIM_RATE)
+
+    result = run(max_ticks, CONTROLLERS[args.controller](), seed, restart=args.restart,
+                 report_every=args.report, record=args.record, wave_script=args.waves)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{result['ticks']} ticks ({result['sim_seconds']}s simulated) in {result['wall_seconds']}s: "
+          f"{result['ticks_per_second']} ticks/s ({result['speedup']}x real time)")
+    for i, r in enumerate(result['runs'], 1):
+        print(f"  run {i} (seed {r['seed']}): score {r['score']}, wave {r['wave']}, kills {r['kills']}, bosses {r['bosses_killed']}, "
+              f"hits taken {r['hits_taken']}, {r['sim_seconds']}s{' (game over)' if r['game_over'] else ''}")
+
+if __name__ == "__main__":
+    main()
@@ -1,84 +1,76 @@
 import pygame
-import random
+import argparse
 import os
 import sys
-import math
+import shutil
+import time
 import traceback
 from settings import *
-from player import Player
-from enemy import Enemy, Boss, Meteor
-from bullet import Bullet
-from vfx import Particle, ScreenShake, Star, BackgroundObject
-from ui import AnimatedText, Button, HealthBar
-from powerups import PowerUp
+from rng import rng
+from vfx import ParticleSystem, ScreenShake, Starfield, BackgroundObject, circle_sprites
+from ui import AnimatedText, Button, HealthBar, DebugOverlay, ProfilerOverlay, GlyphAtlas, draw_neon_text, text_cache, tints
+from enemy import enemy_bullet_pool
+from bullet import bullet_pool
+from powerups import powerup_pool
+from assets import images, fonts, rotations, flipbooks
+from world import World, preload_images, prefill_pools
+from waves import WaveScriptError, load_script
+from controllers import KeyboardController
+from render import Renderer, DirtyRegions, IdleMode
+from replay import ReplayWriter, state_digest
+from profiler import profiler, capture
 
 # Initialize Pygame
 pygame.init()
 pygame.mixer.init()
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.DOUBLEBUF)
-pygame.display.set_caption(TITLE)
 clock = pygame.time.Clock()
 
 class HUD:
+    # Score and lives are composed from a pre-rendered glyph atlas. Setting a
+    # value only marks it dirty; draw() recomposes at most once per frame.
     def __init__(self, assets):
         self.assets = assets
-        self.score_surf = None
-        self.lives_surf = None
+        self.atlas = GlyphAtlas(assets['font_ui'], WHITE, words=("SCORE: ", "LIVES"))
+        self.score_surf = pygame.Surface((300, 60), pygame.SRCALPHA)
+        self.lives_surf = pygame.Surface((150, 60), pygame.SRCALPHA)
+        self.score = None
+        self.lives = None
+        self.score_dirty = False
+        self.lives_dirty = False
         self.update_score(0)
         self.update_lives(3)
 
     def update_score(self, score):
-        # Render to a temporary surface large enough
-        s = pygame.Surface((300, 60), pygame.SRCALPHA)
-        draw_neon_text(s, f"SCORE: {score}", self.assets['font_ui'], WHITE, 280, 30, "ne")
-        self.score_surf = s
+        if score != self.score:
+            self.score = score
+            self.score_dirty = True
 
     def update_lives(self, lives):
-        s = pygame.Surface((150, 60), pygame.SRCALPHA)
-        draw_neon_text(s, "LIVES", self.assets['font_ui'], WHITE, 75, 30, "center")
-        self.lives_surf = s
+        if lives != self.lives:
+            self.lives = lives
+            self.lives_dirty = True
 
     def draw(self, screen):
-        if self.score_surf:
-            screen.blit(self.score_surf, (SCREEN_WIDTH - 300, 0))
-        if self.lives_surf:
-            screen.blit(self.lives_surf, (0, 15))
+        if self.score_dirty:
+            self.score_dirty = False
+            self.score_surf.fill((0, 0, 0, 0))
+            self.atlas.draw(self.score_surf, ["SCORE: "] + list(str(self.score)), 280, 30, "ne")
+        if self.lives_dirty:
+            self.lives_dirty = False
+            self.lives_surf.fill((0, 0, 0, 0))
+            self.atlas.draw(self.lives_surf, ["LIVES"], 75, 30, "center")
+        screen.blit(self.score_surf, (SCREEN_WIDTH - 300, 0))
+        screen.blit(self.lives_surf, (0, 15))
 
 
-def draw_neon_text(surface, text, font, color, x, y, align="center", glow_color=None):
-    if glow_color is None:
-        glow_color = color
-        
-    for offset in [(-2, -2), (2, 2), (-2, 2), (2, -2)]:
-        glow_surf = font.render(text, True, glow_color)
-        glow_rect = glow_surf.get_rect()
-        if align == "center":
-            glow_rect.center = (x + offset[0], y + offset[1])
-        elif align == "nw":
-            glow_rect.topleft = (x + offset[0], y + offset[1])
-        elif align == "ne":
-            glow_rect.topright = (x + offset[0], y + offset[1])
-        glow_surf.set_alpha(100)
-        surface.blit(glow_surf, glow_rect)
-        
-    text_surface = font.render(text, True, color)
-    text_rect = text_surface.get_rect()
-    if align == "nw":
-        text_rect.topleft = (x, y)
-    elif align == "ne":
-        text_rect.topright = (x, y)
-    elif align == "center":
-        text_rect.center = (x, y)
-    surface.blit(text_surface, text_rect)
-    return text_rect
-
 def load_assets():
     assets = {}
-    font_name = pygame.font.match_font('impact') or pygame.font.match_font('arial')
-    assets['font_ui'] = pygame.font.Font(font_name, UI_FONT_SIZE)
-    assets['font_large'] = pygame.font.Font(font_name, GAME_OVER_FONT_SIZE)
-    assets['font_xl'] = pygame.font.Font(font_name, 80)
+    fonts.load_all()
+    assets['font_ui'] = fonts.get('ui')
+    assets['font_large'] = fonts.get('large')
+    assets['font_xl'] = fonts.get('xl')
+    assets['font_debug'] = fonts.get('debug')
     
     try:
         assets['shoot_sound'] = pygame.mixer.Sound(os.path.join(SOUND_DIR, "shoot.wav"))
@@ -95,13 +87,14 @@ def load_assets():
         pygame.mixer.music.set_volume(0.3)
     except: pass
 
-    try:
-        bg_img = pygame.image.load(os.path.join(IMAGE_DIR, "background.png")).convert()
-        assets['bg_image'] = pygame.transform.scale(bg_img, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except:
-        assets['bg_image'] = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        assets['bg_image'].fill(DARK_BLUE)
+    def bg_fallback(size):
+        surf = pygame.Surface(size)
+        surf.fill(DARK_BLUE)
+        return surf
+    assets['bg_image'] = images.get("background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), alpha=False, fallback=bg_fallback)
 
+    preload_images()
+    prefill_pools()
     return assets
 
 def get_high_score():
@@ -118,151 +111,64 @@ def save_high_score(new_score):
     except:
         pass
 
-class WaveManager:
-    def __init__(self):
-        self.wave_index = 0
-        self.waves = [
-            {'name': "Wave 1 - Invasion", 'count': 20, 'rate': 1500, 'type': 'basic'},
-            {'name': "Wave 2 - Assault", 'count': 30, 'rate': 1200, 'type': 'fast'}, 
-            {'name': "Wave 3 - Meteor Shower", 'count': 40, 'rate': 600, 'type': 'meteor'},
-        ]
-        # Infinite waves start after
-        self.infinite_mode = False
-        
-        self.state = "SPAWNING" # SPAWNING, CLEARING, RESTING
-        self.spawned_count = 0
-        self.last_spawn_time = 0
-        self.rest_start_time = 0
-
-    def reset(self):
-        self.wave_index = 0
-        self.state = "SPAWNING"
-        self.spawned_count = 0
-        self.last_spawn_time = 0
-        self.infinite_mode = False
-
-    def update(self, current_time, active_mobs_count, active_boss):
-        if active_boss:
-            return None # Pause everything
-
-        if self.infinite_mode:
-            # Simple random logic
-             if current_time - self.last_spawn_time > 1000:
-                self.last_spawn_time = current_time
-                return 'random'
-             return None
-
-        # Logic
-        wave_data = self.waves[self.wave_index]
-        
-        if self.state == "SPAWNING":
-            if self.spawned_count < wave_data['count']:
-                if current_time - self.last_spawn_time > wave_data['rate']:
-                    self.last_spawn_time = current_time
-                    self.spawned_count += 1
-                    return wave_data['type']
-            else:
-                self.state = "CLEARING"
-
-        elif self.state == "CLEARING":
-            if active_mobs_count == 0:
-                self.state = "RESTING"
-                self.rest_start_time = current_time
-
-        elif self.state == "RESTING":
-            if current_time - self.rest_start_time > WAVE_REST_DURATION:
-                self.next_wave()
-        
-        return None
+def main(render_scale=RENDER_SCALE, scaled_display=DISPLAY_SCALED, fullscreen=DISPLAY_FULLSCREEN, idle_mode=IDLE_MODE,
+         wave_script=WAVE_SCRIPT):
+    flags = pygame.DOUBLEBUF
+    if scaled_display:
+        flags |= pygame.SCALED
+    if fullscreen:
+        flags |= pygame.FULLSCREEN
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+    pygame.display.set_caption(TITLE)
 
-    def next_wave(self):
-        self.wave_index += 1
-        if self.wave_index >= len(self.waves):
-            self.infinite_mode = True
-        else:
-            self.state = "SPAWNING"
-            self.spawned_count = 0
-            self.last_spawn_time = pygame.time.get_ticks()
-
-    def get_info(self):
-        if self.infinite_mode:
-            return "WAVE ∞"
-        if self.state == "RESTING":
-            return "WAVE COMPLETE"
-        return f"{self.waves[self.wave_index]['name']} ({self.spawned_count}/{self.waves[self.wave_index]['count']})"
-
-def main():
     assets = load_assets()
     high_score = get_high_score()
     hud = HUD(assets)
-    wave_manager = WaveManager()
-    
-    # Groups
-    all_sprites = pygame.sprite.Group()
-    mobs = pygame.sprite.Group()
-    bullets = pygame.sprite.Group()
-    particles = pygame.sprite.Group()
-    stars = pygame.sprite.Group() # Parallax stars
-    powerups = pygame.sprite.Group()
-    enemy_bullets = pygame.sprite.Group()
-    boss_group = pygame.sprite.Group() # New group for Boss
-    meteors = pygame.sprite.Group() # Separate group for meteors
+
+    # Simulation (waves, enemies, boss, collisions, score) lives in World
+    particles = ParticleSystem()
+    world = World(particles, interpolate=True, wave_script=wave_script)
+    controller = KeyboardController()
+
+    # Front-end only
+    stars = Starfield() # Parallax stars
     bg_objects = pygame.sprite.Group() # Dynamic background objects
-    
-    # Create Stars
-    for _ in range(50):
-        s = Star([stars]) 
-    
-    player = Player()
-    all_sprites.add(player)
-    
+
     # Logic
-    score = 0
     running = True
     game_state = "MENU"
     paused = False
-    
-    # Boss Logic
-    boss_active = False
-    next_boss_score = BOSS_SPAWN_SCORE
-    
-    # Bg Scroll
-    bg_y = 0
-    
+
     # VFX
     shaker = ScreenShake()
-    
+    renderer = Renderer(assets, world, stars, particles, bg_objects, render_scale)
+    dirty = DirtyRegions(screen)
+    idle = IdleMode(enabled=idle_mode)
+
     # --- UI SETUP ---
     # Menu
     title_text = AnimatedText(TITLE.upper(), assets['font_xl'], CYAN, SCREEN_WIDTH/2, SCREEN_HEIGHT/4, pulse_speed=0.05)
     hs_text_menu = AnimatedText(f"HIGH SCORE: {high_score}", assets['font_ui'], YELLOW, SCREEN_WIDTH/2, SCREEN_HEIGHT/4 + 60, pulse_speed=0.02)
-    
+
+
+    # Replays (every game is recorded; see replay.py)
+    replay_writer = None
+
+    def finish_replay():
+        nonlocal replay_writer
+        if replay_writer:
+            replay_writer.close(state_digest(world))
+            replay_writer = None
 
     def start_game():
-        nonlocal game_state, score, player, boss_active, next_boss_score
+        nonlocal game_state, replay_writer
         game_state = "PLAYING"
-        all_sprites.empty()
-        mobs.empty()
-        bullets.empty()
-        particles.empty()
-        powerups.empty() 
-        enemy_bullets.empty()
-        boss_group.empty()
-        meteors.empty()
+        finish_replay()
+        world.reset(seed=rng.new_seed())
+        if RECORD_REPLAYS:
+            replay_writer = ReplayWriter(REPLAY_PATH, world.seed)
         bg_objects.empty()
-        
-        player = Player()
-        all_sprites.add(player)
-        score = 0
-        hud.update_score(0)
-        hud.update_lives(player.lives)
-        health_bar.set_value(player.lives)
-        
-        boss_active = False
-        next_boss_score = BOSS_SPAWN_SCORE
-        
-        wave_manager.reset()
-        
+
     btn_play = Button("PLAY", assets['font_large'], SCREEN_WIDTH/2, SCREEN_HEIGHT/2, action=start_game)
     btn_quit = Button("QUIT", assets['font_large'], SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 80, bg_color=RED, hover_color=(200, 50, 50))
 
@@ -272,6 +178,49 @@ def main():
         running = False
     btn_quit.action = quit_game
 
+    # Debug (F3)
+    debug_overlay = DebugOverlay(assets['font_debug'])
+    debug_overlay.add_source("clock", lambda: {'fps': round(clock.get_fps(), 1)})
+    debug_overlay.add_source("text", text_cache.stats)
+    debug_overlay.add_source("images", images.stats)
+    debug_overlay.add_source("fonts", fonts.stats)
+    debug_overlay.add_source("rotations", rotations.stats)
+    debug_overlay.add_source("flipbooks", flipbooks.stats)
+    debug_overlay.add_source("flipbook KB by size", flipbooks.memory_stats)
+    debug_overlay.add_source("circles", circle_sprites.stats)
+    debug_overlay.add_source("collisions", world.collisions.stats)
+    debug_overlay.add_source("timers", world.timers.stats)
+    debug_overlay.add_source("bullet pool", bullet_pool.stats)
+    debug_overlay.add_source("enemy bullet pool", enemy_bullet_pool.stats)
+    debug_overlay.add_source("powerup pool", powerup_pool.stats)
+    debug_overlay.add_source("particles", lambda: {'live': len(particles)})
+    debug_overlay.add_source("render", renderer.stats)
+    debug_overlay.add_source("display", dirty.stats)
+    debug_overlay.add_source("idle", idle.stats)
+    debug_overlay.add_source("entities", lambda: {
+        'mobs': len(world.mobs), 'meteors': len(world.meteors), 'bullets': len(world.bullets),
+        'enemy_bullets': len(world.enemy_bullets), 'powerups': len(world.powerups),
+        'boss': len(world.boss_group), 'bg': len(bg_objects)})
+    profiler_overlay = ProfilerOverlay(assets['font_debug'], profiler)
+
+    def capture_state():
+        # Game state stored alongside cProfile captures (F5)
+        wm = world.wave_manager
+        return {
+            'state': game_state, 'paused': paused, 'seed': world.seed, 'ticks': world.ticks,
+            'score': world.score, 'lives': world.player.lives, 'wave': wm.wave_index, 'wave_state': wm.state,
+            'boss_active': world.boss_active, 'fps': round(clock.get_fps(), 1),
+            'mobs': len(world.mobs), 'meteors': len(world.meteors), 'bullets': len(world.bullets),
+            'enemy_bullets': len(world.enemy_bullets), 'powerups': len(world.powerups), 'particles': len(particles),
+        }
+    capture.state_fn = capture_state
+
+    def dump_profile():
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"frames_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        frames = profiler.dump_csv(path)
+        print(f"Profiler: wrote {frames} frames to {path}")
+
     # HUD
     health_bar = HealthBar(20, 20, 200, 20, max_value=PLAYER_LIVES, color=GREEN)
     boss_health_bar = HealthBar(SCREEN_WIDTH//2 - 150, 60, 300, 20, max_value=BOSS_HP, color=PURPLE)
@@ -285,293 +234,84 @@ def main():
         nonlocal game_state
         game_state = "MENU"
     btn_menu.action = set_state_menu
-    
-    # Callbacks
-    def create_particle(pos, color, speed, radius, vector=None):
-        Particle([particles], pos, color, speed, radius, decay=0.2, vector=vector)
-
-    def spawn_explosion(center, color=ORANGE, count=15):
-        for _ in range(count):
-            create_particle(center, color, random.randint(2, 6), random.randint(3, 6))
 
     # Music
     if pygame.mixer.music.get_busy() == False:
         try: pygame.mixer.music.play(-1) 
         except: pass
-        
-    # Events
-    # ADDENEMY = pygame.USEREVENT + 1
-    # pygame.time.set_timer(ADDENEMY, ENEMY_SPAWN_RATE)
-        
-    while running:
-        dt = clock.tick(FPS) / 1000.0
-        current_time = pygame.time.get_ticks()
-        
-        # 1. Event Handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            if game_state == "MENU":
-                btn_play.handle_event(event)
-                btn_quit.handle_event(event)
-                
-            elif game_state == "GAMEOVER":
-                btn_retry.handle_event(event)
-                btn_menu.handle_event(event)
 
-            if game_state == "PLAYING":
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_p:
-                        paused = not paused
-                    if event.key == pygame.K_ESCAPE:
-                        game_state = "MENU"
-                    
-        # 2. Update
-        shake_offset = (0, 0)
-        
+    sounds = {'shoot': assets['shoot_sound'], 'explosion': assets['explosion_sound']}
+
+    def tick():
+        # One fixed simulation step of whatever the current state animates
+        nonlocal game_state, high_score
+        shaker.update()
         if game_state == "MENU":
             title_text.update()
             hs_text_menu.text = f"HIGH SCORE: {high_score}"
             hs_text_menu.update()
-            btn_play.update()
-            btn_quit.update()
-            stars.update()
+            if not (LOW_MOTION_MENUS or idle.active):
+                stars.update()
             particles.update()
+            renderer.hold()
+            profiler.mark('fx_update')
 
         elif game_state == "PLAYING" and not paused:
             # Random Background Object Spawn (Nebula or Planet)
-            if random.random() < 0.001: # 0.1% chance per frame (~once every 16 seconds at 60fps? No, 60 * 0.001 = 0.06 per sec. Once every 16 secs approx)
-                new_bg = BackgroundObject([bg_objects], random.choice(['planet', 'nebula']))
+            if rng.fx.random() < 0.001: # 0.1% chance per tick (~once every 16 seconds at 60 ticks/s)
+                new_bg = BackgroundObject([bg_objects], rng.fx.choice(['planet', 'nebula']))
+
+            world.clock.advance(SIM_STEP_MS)
+            move, target_pos = controller.get_input(world)
+            if replay_writer:
+                replay_writer.record(move, target_pos)
+            profiler.mark('input')
+            world.update(move, target_pos)
+
+            for event in world.events:
+                capture.notify(event[0])
+                if event[0] == 'sound':
+                    if sounds[event[1]]: sounds[event[1]].play()
+                elif event[0] == 'shake':
+                    shaker.shake(event[1], event[2])
+                elif event[0] == 'gameover' and game_state != "GAMEOVER":
+                    game_state = "GAMEOVER"
+                    finish_replay()
+                    if world.score > high_score:
+                        high_score = world.score
+                        save_high_score(high_score)
+
+            profiler.mark('world_events')
+            hud.update_score(world.score)
+            hud.update_lives(world.player.lives)
+            health_bar.set_value(world.player.lives)
+            if world.boss_active:
+                boss_health_bar.set_value(world.boss.hp)
+                boss_health_bar.update()
+            profiler.mark('hud_update')
 
-            # Wave Logic
-            active_mobs_count = len(mobs) + len(meteors)
-            spawn_type = wave_manager.update(current_time, active_mobs_count, boss_active)
-            
-            if spawn_type:
-                 if spawn_type == 'meteor':
-                     m = Meteor()
-                     meteors.add(m)
-                     all_sprites.add(m)
-                 else:
-                     etype = None
-                     if spawn_type == 'fast': etype = 'chaser'
-                     elif spawn_type == 'basic': etype = 'basic'
-                     elif spawn_type == 'random': etype = None
-                     
-                     new_enemy = Enemy(score, enemy_type=etype)
-                     mobs.add(new_enemy)
-                     all_sprites.add(new_enemy)
-
-            # Check Boss Spawn
-            if score >= next_boss_score and not boss_active:
-                boss_active = True
-                new_boss = Boss()
-                boss_group.add(new_boss)
-                all_sprites.add(new_boss)
-                # Ensure no other enemies are clogging the screen (optional, but requested behavior is just pause spawn)
-                
-            # Auto-fire
-            mouse_pos = pygame.mouse.get_pos()
-            if player.shoot(current_time, bullets, lambda x, y, d=None: bullets.add(Bullet(x, y, d)), target_pos=mouse_pos):
-                if assets['shoot_sound']: assets['shoot_sound'].play()
-                for b in bullets:
-                    if b not in all_sprites: all_sprites.add(b)
-
-            player.update(create_particle)
-            mobs.update(player.rect, enemy_bullets)
-            meteors.update()
-            boss_group.update(enemy_bullets) # Boss updates with bullet group
-            bullets.update()
-            enemy_bullets.update()
             stars.update()
             bg_objects.update()
             particles.update()
-            powerups.update()
-            
-            # Collisions: Player <-> Powerups
-            hits = pygame.sprite.spritecollide(player, powerups, True)
-            for hit in hits:
-                player.powerup(hit.type)
-                if hit.type == 'health':
-                    hud.update_lives(player.lives)
-
-            # Check Player <-> Enemy Bullet Collision
-            hits = pygame.sprite.spritecollide(player, enemy_bullets, True)
-            for hit in hits:
-                if player.has_shield:
-                    spawn_explosion(hit.rect.center, BLUE, 10)
-                else:
-                    player.lives -= 1
-                    hud.update_lives(player.lives)
-                    if assets['explosion_sound']: assets['explosion_sound'].play()
-                    spawn_explosion(hit.rect.center, RED, 10)
-                    shaker.shake(5, 5)
-                    if player.lives <= 0:
-                         game_state = "GAMEOVER"
-                         spawn_explosion(player.rect.center, CYAN, 50)
-                         if score > high_score:
-                             high_score = score
-                             save_high_score(high_score)
-
-            # Collisions: Bullet <-> Enemy
-            hits = pygame.sprite.groupcollide(mobs, bullets, False, True) 
-            for enemy, hit_bullets in hits.items():
-                for b in hit_bullets:
-                    score += 10
-                    hud.update_score(score)
-                    create_particle(b.rect.center, ORANGE, 2, 2)
-                    
-                    if enemy.take_damage(1):
-                        score += 90
-                        hud.update_score(score)
-                        enemy.kill()
-                        
-                        if assets['explosion_sound']: assets['explosion_sound'].play()
-                        spawn_explosion(enemy.rect.center, ORANGE)
-                        shaker.shake(5, 5)
-                        
-                        if random.random() < POWERUP_SPAWN_CHANCE:
-                             p = PowerUp(enemy.rect.center)
-                             all_sprites.add(p)
-                             powerups.add(p)
-                
-                if score >= 3500:
-                    player.bullet_count = 5
-
-            # Handle Meteors Collision with Bullets
-            hits = pygame.sprite.groupcollide(meteors, bullets, False, True)
-            for m, hit_bullets in hits.items():
-                for b in hit_bullets:
-                    create_particle(b.rect.center, (100, 100, 100), 2, 2)
-            
-            # Collisions: Player <-> Meteors
-            hits = pygame.sprite.spritecollide(player, meteors, True)
-            for hit in hits:
-                 if player.has_shield:
-                    spawn_explosion(hit.rect.center, BLUE, 30)
-                    shaker.shake(10, 10)
-                 else:
-                    player.lives -= 1
-                    hud.update_lives(player.lives)
-                    if assets['explosion_sound']: assets['explosion_sound'].play()
-                    spawn_explosion(hit.rect.center, (139, 69, 19), 30)
-                    shaker.shake(20, 20)
-                    if player.lives <= 0:
-                        game_state = "GAMEOVER"
-                        spawn_explosion(player.rect.center, CYAN, 50)
-                        if score > high_score:
-                            high_score = score
-                            save_high_score(high_score)
-
-            # Collision: Bullet <-> Boss
-            if boss_active:
-                boss_hits = pygame.sprite.groupcollide(boss_group, bullets, False, True)
-                for boss, hit_bullets in boss_hits.items():
-                    for b in hit_bullets:
-                        # Damage Boss
-                        if boss.state == "FIGHTING": # Invulnerable while entering? Maybe. Let's allow damage.
-                            create_particle(b.rect.center, PURPLE, 2, 2)
-                            is_dead = boss.take_damage(1)
-                            boss_health_bar.set_value(boss.hp)
-                            
-                            if is_dead:
-                                score += 5000
-                                hud.update_score(score)
-                                boss.kill()
-                                boss_active = False
-                                next_boss_score += 5000
-                                spawn_explosion(boss.rect.center, MAGENTA, 100)
-                                shaker.shake(20, 30)
-                                if assets['explosion_sound']: assets['explosion_sound'].play()
-                                
-                                # Spawn a guaranteed powerup
-                                p = PowerUp(boss.rect.center)
-                                all_sprites.add(p)
-                                powerups.add(p)
-
-            # Collisions: Player <-> Mobs
-            hits = pygame.sprite.spritecollide(player, mobs, True)
-            for hit in hits:
-                if player.has_shield:
-                    spawn_explosion(hit.rect.center, BLUE, 20)
-                    shaker.shake(5, 5)
-                else:
-                    player.lives -= 1
-                    hud.update_lives(player.lives)
-                    if assets['explosion_sound']: assets['explosion_sound'].play()
-                    spawn_explosion(hit.rect.center, RED, 20)
-                    shaker.shake(15, 15)
-                    if player.lives <= 0:
-                        game_state = "GAMEOVER"
-                        spawn_explosion(player.rect.center, CYAN, 50)
-                        if score > high_score:
-                            high_score = score
-                            save_high_score(high_score)
-            
-            # Collisions: Player <-> Boss Body
-            if boss_active:
-                hits = pygame.sprite.spritecollide(player, boss_group, False)
-                if hits:
-                    if not player.has_shield:
-                        # Instakill or massive damage?
-                        player.lives = 0
-                        hud.update_lives(player.lives)
-                        game_state = "GAMEOVER"
-                        spawn_explosion(player.rect.center, CYAN, 50)
-                        if score > high_score:
-                             high_score = score
-                             save_high_score(high_score)
-                    else:
-                        # Bounce player back or something? Just keep taking damage if shield up?
-                        # Shield usually protects 1 hit? Let's assume shield breaks instantly on boss
-                        player.has_shield = False
-                        spawn_explosion(player.rect.center, BLUE, 30)
-                        shaker.shake(10, 10)
-                        # Push player down
-                        player.rect.y += 100
+            renderer.scroll()
+            profiler.mark('fx_update')
 
         elif game_state == "GAMEOVER":
             go_text.update()
-            btn_retry.update()
-            btn_menu.update()
-            stars.update()
+            if not (LOW_MOTION_MENUS or idle.active):
+                stars.update()
             particles.update()
+            renderer.hold()
+            profiler.mark('fx_update')
 
-        shake_offset = shaker.get_offset()
-
-        rel_y = bg_y % assets['bg_image'].get_rect().height
-        screen.blit(assets['bg_image'], (0 + shake_offset[0], rel_y - assets['bg_image'].get_rect().height + shake_offset[1]))
-        if rel_y < SCREEN_HEIGHT:
-            screen.blit(assets['bg_image'], (0 + shake_offset[0], rel_y + shake_offset[1]))
-        if game_state == "PLAYING" and not paused:
-            bg_y += 1
-            
-        for star in stars:
-            star.draw(screen, shake_offset)
-            
-        for bg_obj in bg_objects:
-            screen.blit(bg_obj.image, (bg_obj.rect.x + shake_offset[0], bg_obj.rect.y + shake_offset[1]))
-
-        if game_state == "PLAYING" or (game_state == "GAMEOVER" and player.lives > 0):
-             for sprite in all_sprites:
-                 screen.blit(sprite.image, (sprite.rect.x + shake_offset[0], sprite.rect.y + shake_offset[1]))
-             
-             for b in enemy_bullets:
-                 screen.blit(b.image, (b.rect.x + shake_offset[0], b.rect.y + shake_offset[1]))
-        
-        for p in particles:
-            p.draw(screen, shake_offset)
+    def draw_scene(alpha, shake_offset):
+        # Everything that only changes when the simulation moves
+        player = world.player
+        renderer.draw_world(screen, shake_offset, alpha,
+                            show_sprites=game_state == "PLAYING" or (game_state == "GAMEOVER" and player.lives > 0))
 
         if game_state == "MENU":
-            s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 150))
-            screen.blit(s, (0,0))
-            
-            title_text.draw(screen)
-            hs_text_menu.draw(screen)
-            btn_play.draw(screen)
-            btn_quit.draw(screen)
+            tints.draw(screen, (0, 0, 0, 150))
             draw_neon_text(screen, "Mouse to Aim/Shoot", assets['font_ui'], YELLOW, SCREEN_WIDTH/2, SCREEN_HEIGHT - 40)
 
         elif game_state == "PLAYING":
@@ -579,50 +319,179 @@ def main():
              health_bar.draw(screen)
              
              # Draw Wave Info
-             draw_neon_text(screen, wave_manager.get_info(), assets['font_ui'], WHITE, SCREEN_WIDTH//2, 20)
+             draw_neon_text(screen, world.wave_manager.get_info(), assets['font_ui'], WHITE, SCREEN_WIDTH//2, 20)
              
-             if boss_active:
-                 boss_health_bar.update()
+             if world.boss_active:
                  boss_health_bar.draw(screen)
                  # Draw Boss Name
                  draw_neon_text(screen, "WARNING: BOSS APPROACHING", assets['font_ui'], RED, SCREEN_WIDTH/2, 40)
 
 
              if paused:
-                 s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                 s.fill((0, 0, 0, 150))
-                 screen.blit(s, (0,0))
+                 tints.draw(screen, (0, 0, 0, 150))
                  draw_neon_text(screen, "PAUSED", assets['font_xl'], WHITE, SCREEN_WIDTH/2, SCREEN_HEIGHT/2)
 
         elif game_state == "GAMEOVER":
-             if player.lives > 0:
-                 for sprite in all_sprites:
-                     screen.blit(sprite.image, (sprite.rect.x + shake_offset[0], sprite.rect.y + shake_offset[1]))
-             
-             s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-             s.fill((50, 0, 0, 200)) # Red tint
-             screen.blit(s, (0,0))
+             tints.draw(screen, (50, 0, 0, 200)) # Red tint
              
-             go_text.draw(screen)
-             draw_neon_text(screen, f"FINAL SCORE: {score}", assets['font_large'], WHITE, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 40)
+             draw_neon_text(screen, f"FINAL SCORE: {world.score}", assets['font_large'], WHITE, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 40)
              draw_neon_text(screen, f"HIGH SCORE: {high_score}", assets['font_ui'], YELLOW, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 10)
-             
-             btn_retry.draw(screen)
-             btn_menu.draw(screen)
 
-        pygame.display.flip()
+    def draw_widgets():
+        # Pulsing text, buttons and overlays, which can change on any frame.
+        # Returns the rects drawn over (for partial updates).
+        rects = []
+        if game_state == "MENU":
+            rects += [title_text.draw(screen), hs_text_menu.draw(screen), btn_play.draw(screen), btn_quit.draw(screen)]
+        elif game_state == "GAMEOVER":
+            rects += [go_text.draw(screen), btn_retry.draw(screen), btn_menu.draw(screen)]
+        rects.append(debug_overlay.draw(screen))
+        rects.append(profiler_overlay.draw(screen))
+        return rects
+
+    accumulator = 0.0
+
+    while running:
+        frame_ms = idle.wait(clock)
+        profiler.begin_frame()
+        capture.begin_frame()
+
+        # 1. Event Handling
+        for event in pygame.event.get():
+            idle.notify(event)
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.WINDOWEXPOSED:
+                dirty.invalidate() # Window contents may have been lost
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                debug_overlay.toggle()
+                profiler_overlay.toggle()
+                profiler.set_enabled(debug_overlay.visible)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and debug_overlay.visible:
+                dump_profile()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                capture.request(f"F5 at frame {capture.frame}")
+            
+            if game_state == "MENU":
+                btn_play.handle_event(event)
+                btn_quit.handle_event(event)
+                
+            elif game_state == "GAMEOVER":
+                btn_retry.handle_event(event)
+                btn_menu.handle_event(event)
+
+            if game_state == "PLAYING":
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_p:
+                        paused = not paused
+                    if event.key == pygame.K_ESCAPE:
+                        game_state = "MENU"
+        profiler.mark('events')
+
+        # 2. Update: as many fixed ticks as real time has covered
+        accumulator += frame_ms
+        steps = 0
+        while accumulator >= SIM_STEP_MS:
+            if steps == MAX_SIM_STEPS:
+                # Too far behind to catch up; drop the backlog
+                accumulator = 0.0
+                break
+            tick()
+            accumulator -= SIM_STEP_MS
+            steps += 1
+
+        # Hover states follow the mouse every frame
+        if game_state == "MENU":
+            btn_play.update()
+            btn_quit.update()
+        elif game_state == "GAMEOVER":
+            btn_retry.update()
+            btn_menu.update()
+        profiler.mark('buttons')
+
+        # 3. Render, interpolated between the last two ticks
+        alpha = accumulator / SIM_STEP_MS
+        if game_state != "PLAYING" or paused:
+            alpha = 1.0
+        shake_offset = shaker.get_offset()
 
+        # Nothing but the widgets changes (menus: once the stars are frozen):
+        # redraw just those
+        still = shaker.timer == 0 and (
+            (game_state == "PLAYING" and paused) or
+            (game_state != "PLAYING" and not len(particles)))
+        idle.update(still, frame_ms)
+        static = DIRTY_RECTS and still and (game_state == "PLAYING" or LOW_MOTION_MENUS or idle.active)
+        if static:
+            if dirty.begin((game_state, paused)):
+                draw_scene(alpha, shake_offset)
+                dirty.save()
+            profiler.mark('hud')
+            rects = draw_widgets()
+            profiler.mark('overlay')
+            dirty.present(rects)
+        else:
+            dirty.invalidate()
+            draw_scene(alpha, shake_offset)
+            profiler.mark('hud')
+            draw_widgets()
+            profiler.mark('overlay')
+            dirty.flip()
+        profiler.mark('flip')
+        profiler.end_frame()
+        capture.end_frame()
+
+    finish_replay()
+    capture.finish()
+    idle_s, idle_share, full_share, saved = idle.saved()
+    if idle_s:
+        print(f"Idle mode: {idle_s:.0f} s idle at {idle_share:.0%} CPU ({full_share:.0%} at full rate), ~{saved:.1f} s CPU saved")
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("--capture", type=int, metavar="N", help="cProfile N frames, starting at --capture-at")
+    parser.add_argument("--capture-at", type=int, default=1, metavar="FRAME", help="first frame of --capture (default 1)")
+    parser.add_argument("--capture-slow", type=float, default=0, metavar="MS",
+                        help="capture the frames after any frame slower than MS")
+    parser.add_argument("--capture-on", default="", metavar="EVENTS",
+                        help="capture the frames after these world events, e.g. wave,powerup,boss_killed")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE, metavar="S",
+                        help=f"draw the world at S times {SCREEN_WIDTH}x{SCREEN_HEIGHT} (e.g. 0.5; default {RENDER_SCALE:g})")
+    parser.add_argument("--scaled", action="store_true", default=DISPLAY_SCALED,
+                        help="let SDL stretch the frame to the window (pygame.SCALED)")
+    parser.add_argument("--fullscreen", action="store_true", default=DISPLAY_FULLSCREEN)
+    parser.add_argument("--waves", default=WAVE_SCRIPT, metavar="PATH",
+                        help="wave script to play (default assets/waves/default.json)")
+    parser.add_argument("--no-idle", dest="idle", action="store_false", default=IDLE_MODE,
+                        help="keep still screens (pause, menus) at the full frame rate")
+    args = parser.parse_args()
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be in (0, 1]")
+    try:
+        load_script(args.waves)
+    except WaveScriptError as e:
+        parser.error(str(e))
+    if args.capture:
+        capture.request(f"--capture at frame {args.capture_at}", args.capture, at_frame=args.capture_at)
+    capture.slow_ms = args.capture_slow
+    capture.trigger_events = {name for name in args.capture_on.split(",") if name}
+
     try:
-        main()
+        main(args.render_scale, args.scaled, args.fullscreen, args.idle, args.waves)
     except BaseException:
         import datetime
         log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crash_log.txt")
         with open(log_path, "w") as f:
             f.write(f"Crash Timestamp: {datetime.datetime.now()}\n")
             traceback.print_exc(file=f)
+            # Attach the replay of the game in progress (if any)
+            writer = ReplayWriter.active
+            if writer:
+                writer.close()
+                replay_path = os.path.join(os.path.dirname(log_path), "crash_log.replay")
+                shutil.copyfile(writer.path, replay_path)
+                f.write(f"Replay: {replay_path} (seed {writer.seed}, replay with: python headless.py --replay crash_log.replay)\n")
         pygame.quit()
         sys.exit()
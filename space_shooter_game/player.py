@@ -1,27 +1,22 @@
 import pygame
-import os
-import random
 from settings import *
+from assets import images
+from rng import rng
+
+def _player_fallback(size):
+    print("Error loading player image, using fallback surface")
+    surf = pygame.Surface(size)
+    surf.fill(GREEN)
+    return surf
+
+def _player_old_image(size):
+    return images.get("player.png", size, alpha=False, colorkey=True, fallback=_player_fallback)
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, timers):
         super().__init__()
-        # Load image or fallback to surface
-        try:
-            # Try to load the new player image
-            image_path = os.path.join(IMAGE_DIR, "player_new.png")
-            # If player_new doesn't exist, try falling back to player.png
-            if not os.path.exists(image_path):
-                image_path = os.path.join(IMAGE_DIR, "player.png")
-
-            self.image = pygame.image.load(image_path).convert()
-            # Set colorkey to remove background (assumes top-left pixel is background color)
-            self.image.set_colorkey(self.image.get_at((0, 0)))
-            self.image = pygame.transform.scale(self.image, (PLAYER_WIDTH, PLAYER_HEIGHT))
-        except (FileNotFoundError, pygame.error) as e:
-            print(f"Error loading player image: {e}")
-            self.image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.image.fill(GREEN)
+        self.timers = timers # The World's TimerWheel, for power-up expiry
+        self.image = Player.get_image()
         
         self.rect = self.image.get_rect()
         self.rect.midbottom = (PLAYER_START_X, PLAYER_START_Y)
@@ -30,38 +25,47 @@ class Player(pygame.sprite.Sprite):
         self.lives = PLAYER_LIVES
         self.bullet_count = BULLETS_PER_SHOT
         self.shoot_delay = SHOOT_COOLDOWN
-        self.powerups = {}
+        self.powerups = {} # Active timed power-up -> its expiry timer
+        self.expired = [] # Power-ups whose timer ran out, removed in update()
         self.has_shield = False
 
+    @staticmethod
+    def get_image():
+        # Try the new player image, falling back to player.png
+        return images.get("player_new.png", (PLAYER_WIDTH, PLAYER_HEIGHT), alpha=False, colorkey=True,
+                          fallback=_player_old_image)
+
     def powerup(self, p_type):
-        now = pygame.time.get_ticks()
-        self.powerups[p_type] = now + POWERUP_DURATION
-        
         if p_type == 'health':
-            self.lives += 1
-            # One time effect, remove immediately from update tracking if desired,
-            # but keeping it simple. Actually Health doesn't need duration.
-            del self.powerups['health']
-        elif p_type == 'shield':
+            self.lives += 1 # One time effect, no duration
+            return
+        # Picking up an active power-up again restarts its duration
+        self.timers.cancel(self.powerups.get(p_type))
+        self.powerups[p_type] = self.timers.after(POWERUP_DURATION, self.powerup_expired, p_type)
+
+        if p_type == 'shield':
             self.has_shield = True
         elif p_type == 'rapid_fire':
             self.shoot_delay = SHOOT_COOLDOWN / 2
 
-    def update(self, create_particle_callback=None):
+    def powerup_expired(self, p_type):
+        self.expired.append(p_type)
+
+    def update(self, move=0, create_particle_callback=None):
+        # move: -1 left, 0 stay, 1 right (from a controller, see controllers.py)
         # Powerup expiration
-        now = pygame.time.get_ticks()
-        if 'shield' in self.powerups and now > self.powerups['shield']:
-            self.has_shield = False
-            del self.powerups['shield']
-        
-        if 'rapid_fire' in self.powerups and now > self.powerups['rapid_fire']:
-            self.shoot_delay = SHOOT_COOLDOWN
-            del self.powerups['rapid_fire']
+        if self.expired:
+            for p_type in self.expired:
+                del self.powerups[p_type]
+                if p_type == 'shield':
+                    self.has_shield = False
+                elif p_type == 'rapid_fire':
+                    self.shoot_delay = SHOOT_COOLDOWN
+            self.expired = []
 
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
+        if move < 0:
             self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT]:
+        if move > 0:
             self.rect.x += self.speed
 
         # Boundary checks
@@ -74,30 +78,30 @@ class Player(pygame.sprite.Sprite):
         if create_particle_callback:
             # 1. Engine Trail (Always active when moving or just always active for engine idle)
             # Emit from bottom center
-            offset_x = random.randint(-5, 5)
+            offset_x = rng.fx.randint(-5, 5)
             pos = (self.rect.centerx + offset_x, self.rect.bottom - 5)
-            vec = pygame.math.Vector2(0, random.uniform(1, 3)) # Downward
+            vec = pygame.math.Vector2(0, rng.fx.uniform(1, 3)) # Downward
             
             # Color based on speed or random neon
             p_color = CYAN
-            if random.random() < 0.3: p_color = WHITE
+            if rng.fx.random() < 0.3: p_color = WHITE
             
-            create_particle_callback(pos, p_color, random.randint(2, 5), random.randint(2, 4), vector=vec)
+            create_particle_callback(pos, p_color, rng.fx.randint(2, 5), rng.fx.randint(2, 4), vector=vec)
             
             # 2. Damage Smoke (Low Health)
             if self.lives == 1:
                 # Random position on ship
                 smoke_pos = (
-                    self.rect.x + random.randint(0, self.rect.width),
-                    self.rect.y + random.randint(0, self.rect.height)
+                    self.rect.x + rng.fx.randint(0, self.rect.width),
+                    self.rect.y + rng.fx.randint(0, self.rect.height)
                 )
-                smoke_vec = pygame.math.Vector2(random.uniform(-0.5, 0.5), -1) # Upward smoke
+                smoke_vec = pygame.math.Vector2(rng.fx.uniform(-0.5, 0.5), -1) # Upward smoke
                 # Grey/Dark Grey
                 smoke_color = (100, 100, 100)
-                if random.random() < 0.2: smoke_color = (50, 50, 50) # Darker
-                elif random.random() < 0.1: smoke_color = ORANGE # Spark
+                if rng.fx.random() < 0.2: smoke_color = (50, 50, 50) # Darker
+                elif rng.fx.random() < 0.1: smoke_color = ORANGE # Spark
                 
-                create_particle_callback(smoke_pos, smoke_color, random.randint(1, 3), random.randint(3, 8), vector=smoke_vec)
+                create_particle_callback(smoke_pos, smoke_color, rng.fx.randint(1, 3), rng.fx.randint(3, 8), vector=smoke_vec)
 
     def shoot(self, current_time, bullet_group, create_bullet_callback, target_pos=None):
         if current_time - self.last_shot_time >= self.shoot_delay:
@@ -0,0 +1,97 @@
+import pygame
+from settings import *
+
+class PooledSprite(pygame.sprite.Sprite):
+    # A sprite that goes back to its pool when killed. Subclasses put their
+    # setup in reset(*args) so a released object can be reinitialized in place.
+    pool = None
+
+    def reset(self, *args, **kwargs):
+        pass
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+class Pool:
+    # Free list of reusable PooledSprites.
+    #   capacity:  objects kept ready (prefill() creates them, shrink() trims back to it)
+    #   max_size:  hard cap on live + free objects
+    #   overflow:  what acquire() does when max_size objects are all in use:
+    #              'drop' (default) returns None and counts it in `dropped`:
+    #              the new spawn is lost, nothing on screen disappears;
+    #              'recycle' kills and reuses the oldest active object;
+    #              'grow' ignores max_size and allocates anyway
+    # Callers of a 'drop' pool must handle acquire() returning None.
+    def __init__(self, factory, capacity, max_size=None, overflow='drop'):
+        self.factory = factory
+        self.capacity = capacity
+        self.max_size = max_size if max_size is not None else capacity
+        self.overflow = overflow
+        self.free = []
+        self.active = {} # dict keeps insertion order, so the first key is the oldest
+        self.allocated = 0
+        self.reused = 0
+        self.recycled = 0
+        self.dropped = 0
+        self.peak_active = 0
+
+    def _create(self, *args, **kwargs):
+        obj = self.factory(*args, **kwargs)
+        obj.pool = self
+        self.allocated += 1
+        return obj
+
+    def prefill(self, *args, **kwargs):
+        # Build `capacity` objects up front (e.g. during loading)
+        while len(self.free) + len(self.active) < self.capacity:
+            obj = self._create(*args, **kwargs)
+            self.free.append(obj)
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        elif len(self.active) >= self.max_size and self.overflow == 'drop':
+            self.dropped += 1
+            return None
+        elif len(self.active) >= self.max_size and self.overflow == 'recycle':
+            oldest = next(iter(self.active))
+            oldest.kill() # back onto the free list
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.recycled += 1
+        else:
+            obj = self._create(*args, **kwargs)
+
+        self.active[obj] = None
+        if len(self.active) > self.peak_active:
+            self.peak_active = len(self.active)
+        return obj
+
+    def release(self, obj):
+        if obj in self.active:
+            del self.active[obj]
+            self.free.append(obj)
+
+    def release_all(self):
+        for obj in list(self.active):
+            obj.kill()
+
+    def shrink(self):
+        # Drop free objects beyond the configured capacity
+        keep = max(0, self.capacity - len(self.active))
+        del self.free[keep:]
+
+    def stats(self):
+        return {
+            'active': len(self.active),
+            'free': len(self.free),
+            'peak': self.peak_active,
+            'allocated': self.allocated,
+            'reused': self.reused,
+            'recycled': self.recycled,
+            'dropped': self.dropped,
+        }
@@ -1,30 +1,39 @@
 import pygame
-import random
-import os
 from settings import *
+from pool import Pool, PooledSprite
+from rng import rng
+from assets import images, fonts
 
-class PowerUp(pygame.sprite.Sprite):
+def _icon_fallback(power_type):
+    # Color square with the type's initial; rendered once per type
+    def build(size):
+        surf = pygame.Surface(size)
+        surf.fill(POWERUP_COLORS[power_type])
+        text_surf = fonts.get('powerup').render(power_type[0].upper(), True, (0,0,0))
+        surf.blit(text_surf, text_surf.get_rect(center=(size[0]//2, size[1]//2)))
+        return surf
+    return build
+
+class PowerUp(PooledSprite):
     def __init__(self, center):
         super().__init__()
-        self.type = random.choice(list(POWERUP_COLORS.keys()))
-        self.image = pygame.Surface((POWERUP_SIZE, POWERUP_SIZE))
-        self.image.fill(POWERUP_COLORS[self.type])
-        
-        # Add a letter identifier
-        try:
-            font = pygame.font.SysFont('arial', 20, bold=True)
-        except:
-             font = pygame.font.Font(None, 20)
-        text = str(self.type[0]).upper()
-        text_surf = font.render(text, True, (0,0,0))
-        text_rect = text_surf.get_rect(center=(POWERUP_SIZE//2, POWERUP_SIZE//2))
-        self.image.blit(text_surf, text_rect)
+        self.rect = pygame.Rect(0, 0, POWERUP_SIZE, POWERUP_SIZE)
+        self.speed = POWERUP_SPEED
+        self.reset(center)
 
-        self.rect = self.image.get_rect()
+    def reset(self, center):
+        # Reinitialize in place (also used when reused from the pool)
+        self.type = rng.powerup.choice(list(POWERUP_COLORS.keys()))
+        self.image = PowerUp.get_image(self.type) # Shared icon: read-only
         self.rect.center = center
-        self.speed = POWERUP_SPEED
+
+    @staticmethod
+    def get_image(power_type):
+        return images.get(f"powerup_{power_type}.png", (POWERUP_SIZE, POWERUP_SIZE), fallback=_icon_fallback(power_type))
 
     def update(self):
         self.rect.y += self.speed
         if self.rect.top > SCREEN_HEIGHT:
             self.kill()
+
+powerup_pool = Pool(PowerUp, POWERUP_POOL_SIZE, POWERUP_POOL_MAX)
@@ -0,0 +1,196 @@
+import cProfile
+import csv
+import json
+import os
+import pstats
+import time
+import numpy as np
+from settings import *
+
+class FrameProfiler:
+    # Rolling per-phase frame timings. Code calls mark(name) at the end of each
+    # phase and the time since the previous mark (or begin_frame) is charged
+    # to `name`; a phase marked several times in a frame (one per simulation
+    # tick) accumulates. Finished frames go into a ring buffer of the last
+    # `capacity` frames.
+    #
+    # Off by default. Disabled, mark() returns after one attribute check;
+    # enabled, it costs one perf_counter() call and a list add. Enabling or
+    # disabling takes effect at the next begin_frame().
+    MAX_PHASES = 48
+
+    def __init__(self, capacity=PROFILER_HISTORY):
+        self.capacity = capacity
+        self.enabled = False
+        self.requested = False
+        self.phases = []
+        self.index = {}
+        self.history = np.zeros((capacity, self.MAX_PHASES), dtype=np.float32) # ms per phase
+        self.totals = np.zeros(capacity, dtype=np.float32) # ms per frame
+        self.frames = 0
+        self.current = [0.0] * self.MAX_PHASES
+        self.frame_start = 0.0
+        self.last = 0.0
+
+    def set_enabled(self, enabled):
+        self.requested = enabled
+
+    def begin_frame(self):
+        self.enabled = self.requested
+        if self.enabled:
+            self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        i = self.index.get(name)
+        if i is None:
+            i = self._register(name)
+        self.current[i] += now - self.last
+        self.last = now
+
+    def _register(self, name):
+        if len(self.phases) == self.MAX_PHASES - 1:
+            name = "other" # Out of columns; lump the rest together
+            if name in self.index:
+                return self.index[name]
+        i = len(self.phases)
+        self.phases.append(name)
+        self.index[name] = i
+        return i
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = self.frames % self.capacity
+        self.history[row] = self.current
+        self.history[row] *= 1000
+        self.totals[row] = (time.perf_counter() - self.frame_start) * 1000
+        self.current = [0.0] * self.MAX_PHASES
+        self.frames += 1
+
+    def recent(self, count=None):
+        # (totals, per-phase rows) for the last `count` frames, oldest first
+        stored = min(self.frames, self.capacity)
+        count = stored if count is None else min(count, stored)
+        rows = [(self.frames - count + i) % self.capacity for i in range(count)]
+        return self.totals[rows], self.history[rows, :len(self.phases)]
+
+    def averages(self, count=60):
+        # [(phase, mean ms, max ms)] over the last `count` frames, slowest first
+        totals, rows = self.recent(count)
+        if len(totals) == 0:
+            return []
+        means = rows.mean(axis=0)
+        peaks = rows.max(axis=0)
+        stats = [(name, float(means[i]), float(peaks[i])) for i, name in enumerate(self.phases)]
+        stats.sort(key=lambda s: s[1], reverse=True)
+        return stats
+
+    def dump_csv(self, path):
+        # One row per buffered frame: frame number, total ms, then every phase
+        totals, rows = self.recent()
+        first = self.frames - len(totals)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "total_ms"] + self.phases)
+            for i in range(len(totals)):
+                writer.writerow([first + i, f"{totals[i]:.4f}"] + [f"{v:.4f}" for v in rows[i]])
+        return len(totals)
+
+class CaptureProfiler:
+    # Full cProfile call profile of a window of frames, for hitches the phase
+    # timers can only point at. A capture starts at the next begin_frame()
+    # after request() and covers `frames` frames; it is written to
+    # PROFILE_DIR as capture_<first>-<last>.pstats (open with pstats or
+    # snakeviz) plus a .json sidecar with the frame numbers, the trigger,
+    # per-frame times and game state (from state_fn) at both ends.
+    #
+    # Triggers: request() (hotkey or CLI), a frame slower than slow_ms, or a
+    # notify()'d event in `trigger_events`. cProfile cannot profile the past,
+    # so the last two capture the frames right after the hitch. Outside a
+    # capture no profiler is installed; begin/end_frame only check flags
+    # (plus one perf_counter() each while slow_ms is set).
+    def __init__(self, frames=CAPTURE_FRAMES, slow_ms=0, trigger_events=(), folder=PROFILE_DIR):
+        self.frames = frames
+        self.slow_ms = slow_ms
+        self.trigger_events = set(trigger_events)
+        self.folder = folder
+        self.state_fn = None
+        self.frame = 0 # Frames seen so far
+        self.pending = None # (trigger, frames, start frame) waiting to begin
+        self.profile = None
+        self.info = None
+        self.frame_start = 0.0
+        self.cooldown_until = 0
+
+    def request(self, trigger, frames=None, at_frame=0):
+        if self.profile is None and self.pending is None:
+            self.pending = (trigger, frames or self.frames, at_frame)
+
+    def notify(self, event):
+        # Automatic triggers respect the cooldown so a steady hitch doesn't
+        # produce a capture every few seconds
+        if event in self.trigger_events and self.frame >= self.cooldown_until:
+            self.request(f"event {event} at frame {self.frame}")
+
+    def begin_frame(self):
+        self.frame += 1
+        if self.pending and self.frame >= self.pending[2]:
+            self._start()
+        if self.profile is not None or self.slow_ms:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.profile is not None:
+            info = self.info
+            info['frame_ms'].append(round((time.perf_counter() - self.frame_start) * 1000, 3))
+            if len(info['frame_ms']) >= info['frames']:
+                self.finish()
+        elif self.slow_ms and self.frame >= self.cooldown_until:
+            ms = (time.perf_counter() - self.frame_start) * 1000
+            if ms > self.slow_ms:
+                self.request(f"slow frame {self.frame} ({ms:.1f} ms)")
+
+    def _start(self):
+        trigger, frames, _ = self.pending
+        self.pending = None
+        self.info = {
+            'trigger': trigger,
+            'first_frame': self.frame,
+            'frames': frames,
+            'frame_ms': [],
+            'state_start': self.state_fn() if self.state_fn else None,
+        }
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def finish(self):
+        # Stop the capture in progress (if any) and write it out; returns the
+        # .pstats path
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        info = self.info
+        info['last_frame'] = info['first_frame'] + len(info['frame_ms']) - 1
+        info['state_end'] = self.state_fn() if self.state_fn else None
+        stats = pstats.Stats(self.profile)
+        info['top_cumulative'] = [
+            {'function': pstats.func_std_string(func), 'calls': nc, 'tottime_ms': round(tt * 1000, 3), 'cumtime_ms': round(ct * 1000, 3)}
+            for func, (cc, nc, tt, ct, callers) in sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+        ]
+
+        os.makedirs(self.folder, exist_ok=True)
+        base = os.path.join(self.folder, f"capture_{time.strftime('%Y%m%d_%H%M%S')}_f{info['first_frame']}-{info['last_frame']}")
+        stats.dump_stats(base + ".pstats")
+        with open(base + ".json", "w") as f:
+            json.dump(info, f, indent=2)
+        self.profile = None
+        self.info = None
+        self.cooldown_until = self.frame + CAPTURE_COOLDOWN
+        print(f"Profiler: captured frames {info['first_frame']}-{info['last_frame']} ({info['trigger']}) to {base}.pstats")
+        return base + ".pstats"
+
+profiler = FrameProfiler()
+capture = CaptureProfiler()
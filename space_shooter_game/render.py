@@ -0,0 +1,339 @@
+import time
+import pygame
+from itertools import chain
+from operator import attrgetter
+from settings import *
+from profiler import profiler
+from assets import scaled_images
+
+get_image = attrgetter('image')
+get_rect = attrgetter('rect')
+
+class RenderQueue:
+    # One frame's blits, bucketed by layer and drawn bottom to top with a
+    # single Surface.blits() call per layer. Producers submit whole batches
+    # (any iterable of blits() items, consumed lazily at flush) that keep
+    # their submission order within a layer; with RENDER_GROUP_BY_SOURCE
+    # each batch is also sorted by source surface. HUD and menus are not
+    # queued: they go over the finished world.
+    BACKGROUND, BG_OBJECTS, ENEMIES, PICKUPS, BULLETS, PLAYER, PARTICLES = range(7)
+
+    def __init__(self):
+        self.layers = [[] for _ in range(self.PARTICLES + 1)]
+        self.batches = 0 # Totals for the F3 overlay
+        self.calls = 0
+
+    def submit(self, layer, source, dest, area=None, flags=0):
+        self.layers[layer].append(((source, dest, area, flags),))
+
+    def extend(self, layer, blits):
+        self.layers[layer].append(blits)
+
+    def flush(self, surface):
+        for i, batches in enumerate(self.layers):
+            if not batches:
+                continue
+            items = batches[0] if len(batches) == 1 else chain.from_iterable(batches)
+            surface.blits(items, doreturn=False)
+            self.batches += len(batches)
+            self.calls += 1
+            self.layers[i] = []
+
+    def stats(self):
+        return {'batches': self.batches, 'blits_calls': self.calls}
+
+class Renderer:
+    # Draws the game world (scrolling background, stars, background objects,
+    # sprites and particles) for one rendered frame through a RenderQueue.
+    # The world is drawn at its natural coordinates into an offscreen
+    # surface, then composited to the screen with a single blit; screen
+    # shake is just that blit's offset. The simulation runs in fixed ticks,
+    # so a frame usually lands between two of them; `alpha` is how far
+    # (0 = previous tick, 1 = latest) and positions are interpolated
+    # accordingly. UI and HUD are drawn on top by the caller, unshaken.
+    #
+    # With a render `scale` below 1 the offscreen world is that much smaller
+    # and everything in it (images, positions, particles, stars) is resized
+    # to match, then stretched back to the screen in the composite blit. The
+    # simulation keeps its logical coordinates either way.
+    SNAP_DISTANCE = 64 # Moves larger than this in one tick (respawns, knockback) are not interpolated
+
+    def __init__(self, assets, world, stars, particles, bg_objects, scale=RENDER_SCALE):
+        self.scale = scale
+        self.size = (int(round(SCREEN_WIDTH * scale)), int(round(SCREEN_HEIGHT * scale)))
+        self.bg_image = assets['bg_image']
+        if scale != 1:
+            self.bg_image = scaled_images.get(self.bg_image, scale)
+        self.bg_height = self.bg_image.get_rect().height
+        self.world = world
+        self.stars = stars
+        self.particles = particles
+        self.bg_objects = bg_objects
+        self.queue = RenderQueue()
+        self.target = pygame.Surface(self.size).convert()
+        # Stretched copy of the target, only needed to shake a scaled frame
+        self.stretched = None
+        # Bg Scroll
+        self.bg_y = 0
+        self.prev_bg_y = 0
+
+    def scroll(self):
+        # One tick of background scroll (only while playing)
+        self.prev_bg_y = self.bg_y
+        self.bg_y += 1
+
+    def hold(self):
+        # No scroll this tick
+        self.prev_bg_y = self.bg_y
+
+    def submit_background(self, alpha=1.0):
+        queue = self.queue
+        bg_y = self.prev_bg_y + (self.bg_y - self.prev_bg_y) * alpha
+        rel_y = int(bg_y * self.scale % self.bg_height)
+        queue.submit(queue.BACKGROUND, self.bg_image, (0, rel_y - self.bg_height))
+        if rel_y < self.size[1]:
+            queue.submit(queue.BACKGROUND, self.bg_image, (0, rel_y))
+        queue.extend(queue.BACKGROUND, self.stars.blit_list(self.target, alpha, self.scale))
+        self.submit_sprites(queue.BG_OBJECTS, self.bg_objects)
+
+    def submit_sprites(self, layer, sprites, alpha=1.0):
+        # Queues one blit per sprite. Without interpolation or scaling the
+        # sprites' own Rects are the destinations, so nothing per sprite runs
+        # in Python.
+        sprites = list(sprites)
+        n = len(sprites)
+        if not n:
+            return
+        images = list(map(get_image, sprites))
+        back = 1 - alpha
+        prev_centers = self.world.prev_centers
+        scale = self.scale
+        if back and prev_centers:
+            snap = self.SNAP_DISTANCE
+            dests = []
+            append = dests.append
+            for sprite in sprites:
+                rect = sprite.rect
+                prev = prev_centers.get(sprite)
+                if prev is not None:
+                    dx = (prev[0] - rect.centerx) * back
+                    dy = (prev[1] - rect.centery) * back
+                    if -snap < dx < snap and -snap < dy < snap:
+                        append((int((rect.x + dx) * scale), int((rect.y + dy) * scale)))
+                        continue
+                append(rect if scale == 1 else (int(rect.x * scale), int(rect.y * scale)))
+        elif scale != 1:
+            dests = [(int(rect.x * scale), int(rect.y * scale)) for rect in map(get_rect, sprites)]
+        else:
+            dests = list(map(get_rect, sprites)) # blits() takes a Rect as dest
+        if scale != 1:
+            images = scaled_images.get_all(images, scale)
+        if RENDER_GROUP_BY_SOURCE and n > 1 and len(dict.fromkeys(images)) > 1:
+            # Stable sort on the images' ids, keyed by a builtin (no Python calls)
+            ids = list(map(id, images))
+            order = sorted(range(n), key=ids.__getitem__)
+            self.queue.extend(layer, zip(map(images.__getitem__, order), map(dests.__getitem__, order)))
+        else:
+            self.queue.extend(layer, zip(images, dests))
+
+    def draw_world(self, screen, offset=(0, 0), alpha=1.0, show_sprites=True):
+        world = self.world
+        queue = self.queue
+        self.submit_background(alpha)
+        profiler.mark('submit_background')
+        if show_sprites:
+            self.submit_sprites(queue.ENEMIES, world.meteors, alpha)
+            self.submit_sprites(queue.ENEMIES, world.mobs, alpha)
+            self.submit_sprites(queue.ENEMIES, world.boss_group, alpha)
+            self.submit_sprites(queue.PICKUPS, world.powerups, alpha)
+            self.submit_sprites(queue.BULLETS, world.bullets, alpha)
+            self.submit_sprites(queue.BULLETS, world.enemy_bullets, alpha)
+            self.submit_sprites(queue.PLAYER, (world.player,), alpha)
+        profiler.mark('submit_sprites')
+        queue.extend(queue.PARTICLES, self.particles.blit_list(alpha, self.scale))
+        profiler.mark('submit_particles')
+        queue.flush(self.target)
+        profiler.mark('blits')
+        self.composite(screen, offset)
+        profiler.mark('composite')
+
+    def composite(self, screen, offset=(0, 0)):
+        # Copy the finished world to the screen, shifted by the shake offset;
+        # the strips it uncovers are cleared. A scaled world is stretched
+        # straight onto the screen, or into a full-size copy when shaken.
+        ox, oy = offset
+        if self.scale == 1:
+            screen.blit(self.target, offset)
+        else:
+            stretch = pygame.transform.smoothscale if RENDER_SMOOTH else pygame.transform.scale
+            size = screen.get_size()
+            if ox or oy:
+                if self.stretched is None or self.stretched.get_size() != size:
+                    self.stretched = pygame.Surface(size).convert()
+                stretch(self.target, size, self.stretched)
+                screen.blit(self.stretched, offset)
+            else:
+                stretch(self.target, size, screen)
+        if ox or oy:
+            w, h = screen.get_size()
+            if ox > 0:
+                screen.fill(BLACK, (0, 0, ox, h))
+            elif ox < 0:
+                screen.fill(BLACK, (w + ox, 0, -ox, h))
+            if oy > 0:
+                screen.fill(BLACK, (0, 0, w, oy))
+            elif oy < 0:
+                screen.fill(BLACK, (0, h + oy, w, -oy))
+
+    def stats(self):
+        stats = self.queue.stats()
+        stats['scale'] = f"{self.scale:g}x ({self.size[0]}x{self.size[1]})"
+        return stats
+
+class DirtyRegions:
+    # Partial display updates for frames where only a few widgets change:
+    # paused, or menus once nothing in the world is moving (stars too, with
+    # LOW_MOTION_MENUS). The static scene is drawn once and kept as a
+    # backdrop; later frames repaint the backdrop under last frame's widgets,
+    # redraw the widgets and push only those rects with display.update().
+    # Anything that moves the whole frame (scrolling, shake, sprites) goes
+    # through the normal full redraw and flip, which also invalidates the
+    # backdrop.
+    def __init__(self, screen):
+        self.screen = screen
+        self.backdrop = pygame.Surface(screen.get_size()).convert()
+        self.key = None # Scene the backdrop shows; None = no valid backdrop
+        self.redraw = False
+        self.prev_rects = []
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.pixels = 0
+
+    def invalidate(self):
+        self.key = None
+
+    def begin(self, key):
+        # Start a static frame showing scene `key`. Returns True when the
+        # caller must draw the scene and call save(); otherwise last frame's
+        # widget rects have been restored from the backdrop.
+        self.redraw = key != self.key
+        if self.redraw:
+            self.key = key
+        else:
+            self.screen.blits([(self.backdrop, rect, rect) for rect in self.prev_rects], doreturn=False)
+        return self.redraw
+
+    def save(self):
+        self.backdrop.blit(self.screen, (0, 0))
+
+    def present(self, rects):
+        # Show the frame: `rects` are this frame's widgets (None entries skipped)
+        rects = [rect.clip(self.screen.get_rect()) for rect in rects if rect]
+        if self.redraw:
+            self.flip()
+        else:
+            changed = self.prev_rects + rects
+            pygame.display.update(changed)
+            self.partial_frames += 1
+            self.pixels += sum(rect.w * rect.h for rect in changed)
+        self.prev_rects = rects
+
+    def flip(self):
+        pygame.display.flip()
+        self.full_frames += 1
+        self.pixels += self.screen.get_width() * self.screen.get_height()
+
+    def stats(self):
+        frames = self.full_frames + self.partial_frames
+        area = self.screen.get_width() * self.screen.get_height()
+        return {
+            'full': self.full_frames,
+            'partial': self.partial_frames,
+            'pushed': f"{self.pixels / (frames * area) * 100:.0f}%" if frames else "-",
+        }
+
+class IdleMode:
+    # Low-power pacing for still screens. The caller reports every event
+    # (notify) and, once per frame, whether the screen could idle (update).
+    # After `delay_ms` of still frames without input it turns active: wait()
+    # then blocks in pygame.event.wait() for up to a 1/fps frame instead of
+    # running at RENDER_FPS, and the caller freezes the world so DirtyRegions
+    # only redraws the animated widgets. The first input event deactivates
+    # it and is put back on the queue for the normal event loop.
+    #
+    # Process CPU time is summed separately for idle frames and for still
+    # frames at the full rate (the wait before idling), which gives the
+    # saving: (full-rate CPU share - idle CPU share) * time spent idle.
+    WAKE_EVENTS = {
+        pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+        pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.JOYAXISMOTION,
+        pygame.JOYBUTTONDOWN, pygame.JOYHATMOTION, pygame.QUIT,
+    }
+
+    def __init__(self, fps=IDLE_FPS, delay_ms=IDLE_DELAY_MS, enabled=IDLE_MODE):
+        self.fps = fps
+        self.delay_ms = delay_ms
+        self.enabled = enabled
+        self.active = False
+        self.woke = False
+        self.still = False # Last frame was still, but at the full rate
+        self.still_ms = 0
+        # [wall seconds, CPU seconds] per kind of frame
+        self.idle_time = [0.0, 0.0]
+        self.still_time = [0.0, 0.0]
+        self.bucket = None # Where the frame being timed goes
+        self.last_wall = time.perf_counter()
+        self.last_cpu = time.process_time()
+
+    def wait(self, clock):
+        # Paces one frame; returns the ms since the last one, as clock.tick() does
+        self._account()
+        self.bucket = self.idle_time if self.active else self.still_time if self.still else None
+        if not self.active:
+            return clock.tick(RENDER_FPS)
+        event = pygame.event.wait(1000 // self.fps)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+        return clock.tick()
+
+    def notify(self, event):
+        if event.type in self.WAKE_EVENTS:
+            self.woke = True
+
+    def update(self, still, frame_ms):
+        # `still`: nothing but animated widgets would change this frame
+        if not self.enabled or not still or self.woke:
+            self.active = False
+            self.still = still
+            self.still_ms = 0
+        elif not self.active:
+            self.still = True
+            self.still_ms += frame_ms
+            self.active = self.still_ms >= self.delay_ms
+        self.woke = False
+
+    def _account(self):
+        # Charge the time since the previous wait() to the frame it paced
+        wall, cpu = time.perf_counter(), time.process_time()
+        bucket = self.bucket
+        if bucket is not None:
+            bucket[0] += wall - self.last_wall
+            bucket[1] += cpu - self.last_cpu
+        self.last_wall, self.last_cpu = wall, cpu
+
+    def saved(self):
+        # (idle seconds, CPU share idle, CPU share at full rate, CPU seconds saved)
+        idle_wall, idle_cpu = self.idle_time
+        still_wall, still_cpu = self.still_time
+        idle_share = idle_cpu / idle_wall if idle_wall else 0.0
+        full_share = still_cpu / still_wall if still_wall else 0.0
+        return idle_wall, idle_share, full_share, max(0.0, (full_share - idle_share) * idle_wall)
+
+    def stats(self):
+        idle_wall, idle_share, full_share, saved = self.saved()
+        return {
+            'active': self.active,
+            'idle_s': round(idle_wall, 1),
+            'cpu': f"{idle_share:.0%} idle / {full_share:.0%} full",
+            'saved_cpu_s': round(saved, 1),
+        }
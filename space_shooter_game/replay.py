@@ -0,0 +1,161 @@
+import hashlib
+import os
+import struct
+import time
+from settings import *
+from world import World
+
+# Replay file: the run's seed plus the player's input for every simulation
+# tick, run-length encoded, so a replay is a few bytes per input change.
+#   header:  magic, version, seed, sim rate
+#   records: (run, move, target_x, target_y), repeated `run` ticks;
+#            NO_TARGET in target_x means "fire straight up"
+#   end:     a record with run == 0, then total ticks and an optional
+#            SHA-256 digest of the final world state (see state_digest)
+# Files are written and read as a stream, so a crashed session still leaves
+# everything up to the crash on disk.
+# The wave script is not stored: replay with the one the run used.
+MAGIC = b"GDRP"
+VERSION = 2 # 2: spawns come from compiled wave timelines (waves.py)
+HEADER = struct.Struct("<4sBIH")
+RECORD = struct.Struct("<Hbhh")
+END = struct.Struct("<IB")
+NO_TARGET = -32768
+MAX_RUN = 0xFFFF
+
+def state_digest(world):
+    # Fingerprint of everything that matters for a run: two replays of the
+    # same file must produce the same digest
+    h = hashlib.sha256()
+    wm = world.wave_manager
+    player = world.player
+    h.update(repr((world.ticks, world.clock.get_ticks(), world.score, player.lives, tuple(player.rect),
+                   world.boss_active, wm.wave_index, wm.state, wm.spawned_count, wm.infinite_mode)).encode())
+    for group in (world.all_sprites, world.enemy_bullets):
+        h.update(repr([tuple(sprite.rect) for sprite in group]).encode())
+    return h.digest()
+
+class ReplayWriter:
+    # Records one run. record() is called once per tick with the input that
+    # tick used; close() ends the stream, optionally with the final digest.
+    active = None # Writer currently recording, so the crash handler can finish it
+
+    def __init__(self, path, seed):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.seed = seed
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, SIM_RATE))
+        self.current = None
+        self.run = 0
+        self.ticks = 0
+        ReplayWriter.active = self
+
+    def record(self, move, target_pos):
+        if target_pos is None:
+            entry = (move, NO_TARGET, 0)
+        else:
+            entry = (move, max(-32767, min(32767, int(target_pos[0]))), max(-32767, min(32767, int(target_pos[1]))))
+        self.ticks += 1
+        if entry == self.current and self.run < MAX_RUN:
+            self.run += 1
+            return
+        self._write_run()
+        self.current = entry
+        self.run = 1
+
+    def _write_run(self):
+        if self.run:
+            self.file.write(RECORD.pack(self.run, *self.current))
+
+    def close(self, digest=None):
+        if self.file is None:
+            return
+        self._write_run()
+        self.file.write(RECORD.pack(0, 0, 0, 0))
+        self.file.write(END.pack(self.ticks, 1 if digest else 0))
+        if digest:
+            self.file.write(digest)
+        self.file.close()
+        self.file = None
+        if ReplayWriter.active is self:
+            ReplayWriter.active = None
+
+class ReplayReader:
+    # Iterating yields (move, target_pos) per tick, streamed from the file.
+    # Once the iteration finishes, `ticks` and `digest` hold the recorded
+    # totals (digest is None if the run never finished, e.g. a crash).
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        magic, version, self.seed, self.sim_rate = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        self.ticks = None
+        self.digest = None
+
+    def __iter__(self):
+        f = self.file
+        while True:
+            chunk = f.read(RECORD.size)
+            if len(chunk) < RECORD.size:
+                break # Truncated (recording was interrupted)
+            run, move, tx, ty = RECORD.unpack(chunk)
+            if run == 0:
+                tail = f.read(END.size)
+                if len(tail) == END.size:
+                    self.ticks, has_digest = END.unpack(tail)
+                    if has_digest:
+                        self.digest = f.read(32)
+                break
+            target = None if tx == NO_TARGET else (tx, ty)
+            for _ in range(run):
+                yield move, target
+        f.close()
+
+class ReplayController:
+    # Feeds recorded input back to the world one tick at a time
+    def __init__(self, reader):
+        self.inputs = iter(reader)
+        self.finished = False
+
+    def get_input(self, world):
+        step = next(self.inputs, None)
+        if step is None:
+            self.finished = True
+            return 0, None
+        return step
+
+def play(path, world=None):
+    # Re-simulate a replay as fast as possible and check it reproduces the
+    # recorded run. Returns a summary including 'verified' (None when the
+    # file has no digest to compare against).
+    reader = ReplayReader(path)
+    if reader.sim_rate != SIM_RATE:
+        raise ValueError(f"replay was recorded at {reader.sim_rate} ticks/s, game runs at {SIM_RATE}")
+    world = world or World()
+    world.reset(seed=reader.seed)
+    controller = ReplayController(reader)
+
+    start = time.perf_counter()
+    while True:
+        move, target_pos = controller.get_input(world)
+        if controller.finished:
+            break
+        world.clock.advance(SIM_STEP_MS)
+        world.update(move, target_pos)
+    wall = time.perf_counter() - start
+
+    verified = None
+    if reader.digest is not None:
+        verified = reader.ticks == world.ticks and reader.digest == state_digest(world)
+    result = world.summary()
+    result.update({
+        'seed': reader.seed,
+        'wall_seconds': round(wall, 3),
+        'ticks_per_second': round(world.ticks / wall) if wall > 0 else None,
+        'verified': verified,
+    })
+    return result
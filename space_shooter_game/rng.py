@@ -0,0 +1,29 @@
+import random
+
+class RandomStreams:
+    # One independently seeded random.Random per subsystem, all derived from a
+    # single run seed. Gameplay draws only from its own stream, so cosmetic
+    # randomness (engine trails, stars, shake) never shifts what spawns, and
+    # a run is fully determined by its seed plus the player's input.
+    #   enemy:   enemy type, speed and spawn position
+    #   meteor:  meteor size, position, speed and spin
+    #   boss:    attack pattern choice and sweep spread
+    #   powerup: drop chance and power-up type
+    #   fx:      visual-only effects (not part of the simulation)
+    STREAMS = ('enemy', 'meteor', 'boss', 'powerup', 'fx')
+
+    def __init__(self, seed=0):
+        self.seed(seed)
+
+    def seed(self, seed):
+        # Seeds are 32-bit so they fit in a replay header
+        self.seed_value = seed & 0xFFFFFFFF
+        for name in self.STREAMS:
+            # str seeds hash deterministically (unlike hash() of a tuple)
+            setattr(self, name, random.Random(f"{self.seed_value}:{name}"))
+
+    @staticmethod
+    def new_seed():
+        return random.SystemRandom().randrange(1 << 32)
+
+rng = RandomStreams()
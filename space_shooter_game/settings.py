@@ -6,6 +6,44 @@ SCREEN_HEIGHT = 600
 FPS = 60
 TITLE = "Galactic Defender"
 
+# Timing
+# Gameplay runs in fixed ticks; rendering interpolates between them.
+# SIM_RATE is fixed, not a setting: speeds are pixels per tick while
+# cooldowns and waves are in ms, so another rate would change game speed
+# and difficulty (and replays record it, refusing any other). The render
+# rate is the configurable one: RENDER_FPS only changes smoothness.
+SIM_RATE = 60 # Simulation ticks per second; do not change
+SIM_STEP_MS = 1000 / SIM_RATE
+RENDER_FPS = FPS # Render frame cap (0 = uncapped)
+MAX_SIM_STEPS = 5 # Ticks run per rendered frame before dropping time (avoids a death spiral)
+# Cooldowns and timed effects run on a timer wheel (timers.py) in whole
+# ticks. Slots per level as bit counts; each slot of a level spans the
+# whole level below it.
+TIMER_WHEEL_BITS = (8, 6, 6) # 256 ticks (~4 s), then ~4.5 min, then ~4.9 h
+
+# Rendering
+# Static screens (paused, settled menus) redraw only their animated widgets
+# and push those rects with display.update(); cheaper on software renderers
+DIRTY_RECTS = True
+LOW_MOTION_MENUS = False # Freeze the starfield in menus so they can go static too
+# Idle mode: once a screen has been still (paused, or a menu with nothing
+# moving) for IDLE_DELAY_MS with no input, the world freezes and the loop
+# sleeps in event.wait() between IDLE_FPS frames; input wakes it at once
+IDLE_MODE = True
+IDLE_FPS = 15
+IDLE_DELAY_MS = 2000
+RENDER_GROUP_BY_SOURCE = False # Sort each batch by source surface (for GPU-backed targets; costs 4-12% in software blits)
+# The world (background, stars, sprites, particles) is drawn at RENDER_SCALE
+# times the logical size and stretched to it in one pass; HUD and menus stay
+# sharp. 0.5 draws a quarter of the pixels (400x300) for slow machines.
+RENDER_SCALE = 1.0
+RENDER_SMOOTH = False # smoothscale() the stretch: softer, but slower than scale()
+SCALED_CACHE_SIZE = 2048 # Max resized sprite images kept per render scale
+# Let SDL stretch the logical SCREEN_WIDTH x SCREEN_HEIGHT frame to the
+# window (pygame.SCALED), e.g. to fill a big or fullscreen display
+DISPLAY_SCALED = False
+DISPLAY_FULLSCREEN = False
+
 # Colors (R, G, B)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -30,9 +68,26 @@ ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 IMAGE_DIR = os.path.join(ASSETS_DIR, "images")
 SOUND_DIR = os.path.join(ASSETS_DIR, "sounds")
 
+# Asset Cache Settings
+ROTATION_STEP = 2 # Degrees per cached rotation bucket
+ROTATION_CACHE_SIZE = 1024 # Max pre-rotated surfaces kept in memory
+
 # UI Settings
 UI_FONT_SIZE = 24
 GAME_OVER_FONT_SIZE = 64
+DEBUG_FONT_SIZE = 16
+TEXT_CACHE_SIZE = 256 # Max cached neon text surfaces (LRU)
+TEXT_SCALE_STEP = 0.01 # AnimatedText pulse scale quantization
+UI_FONT_FAMILIES = ('impact', 'arial') # First one installed wins
+# Every font the game uses, resolved and loaded once at startup:
+# name -> (font families to try, size, bold)
+FONTS = {
+    'ui': (UI_FONT_FAMILIES, UI_FONT_SIZE, False),
+    'large': (UI_FONT_FAMILIES, GAME_OVER_FONT_SIZE, False),
+    'xl': (UI_FONT_FAMILIES, 80, False),
+    'debug': (UI_FONT_FAMILIES, DEBUG_FONT_SIZE, False),
+    'powerup': (('arial',), 20, True), # Letter on the power-up icons
+}
 
 # Player settings
 PLAYER_SPEED = 6 # Slightly faster
@@ -51,6 +106,10 @@ BULLET_COLOR = NEON_GREEN
 SHOOT_COOLDOWN = 200  # Faster fire rate
 BULLETS_PER_SHOT = 3
 SPREAD_ANGLE = 10
+BULLET_POOL_SIZE = 64 # Bullets kept ready for reuse
+BULLET_POOL_MAX = 512 # Past this many live bullets new shots are dropped (live ones are never cut short)
+ENEMY_BULLET_POOL_SIZE = 128
+ENEMY_BULLET_POOL_MAX = 1024
 
 # Enemy settings
 ENEMY_SPEED_MIN = 0.5
@@ -59,12 +118,21 @@ ENEMY_WIDTH = 45
 ENEMY_HEIGHT = 45
 ENEMY_SPAWN_RATE = 1500  # More intense
 
+# Collision Settings
+COLLISION_CELL_SIZE = ENEMY_WIDTH # Spatial hash cell size in pixels
+# Below this many sprite pairs plain pygame collision is faster (crossover
+# measured with bench_collision.py: 12-15k). Normal play and the benchmark
+# scenarios stay under ~4k pairs, so the spatial hash is for stress loads.
+COLLISION_BRUTE_LIMIT = 15000
+
 # Meteor Settings
 METEOR_MIN_SPEED = 2
 METEOR_MAX_SPEED = 6
 METEOR_MIN_SIZE = 30
 METEOR_MAX_SIZE = 80
 METEOR_COLOR = (139, 69, 19) # Brown
+METEOR_SIZE_BUCKET = 10 # Meteor sizes snap to this step so they share rotation frames
+METEOR_ROTATION_FRAMES = 72 # Precomputed rotation frames per meteor size (5 degrees each)
 
 # Boss Settings
 BOSS_SPAWN_SCORE = 5000
@@ -77,6 +145,14 @@ BOSS_SPEED = 2
 # VFX Settings
 SCREEN_SHAKE_AMOUNT = 5
 PARTICLE_DECAY = 2
+PARTICLE_CAPACITY = 4096 # Initial particle array size (grows on demand)
+STAR_COUNT = 50 # Background stars (pre-rendered, so thousands cost the same)
+STAR_LAYERS = 3 # Parallax depth layers
+STAR_TWINKLE_PHASES = 8 # Independent twinkle groups per star color
+STAR_TWINKLE_KEYFRAMES = 24 # Pre-baked twinkle frames per layer
+PARTICLE_GLOW = False # Draw particles as additive (BLEND_ADD) glow sprites
+SPRITE_CACHE_SIZE = 2048 # Max cached circle sprites (LRU)
+SPRITE_ALPHA_STEP = 8 # Alpha quantization for cached circle sprites
 
 # Power-up Settings
 POWERUP_SPAWN_CHANCE = 0.1  # 10% chance
@@ -88,6 +164,22 @@ POWERUP_COLORS = {
     'rapid_fire': (255, 255, 0) # Yellow
 }
 POWERUP_DURATION = 5000 # 5 seconds for temporary effects
+POWERUP_POOL_SIZE = 4
+POWERUP_POOL_MAX = 32
 
 # Wave Settings
 WAVE_REST_DURATION = 3000 # 3 seconds
+WAVE_DIR = os.path.join(ASSETS_DIR, "waves")
+WAVE_SCRIPT = os.path.join(WAVE_DIR, "default.json") # Wave script format: see waves.py
+
+# Replay Settings
+RECORD_REPLAYS = True # Record every game so it can be replayed (see replay.py)
+REPLAY_DIR = os.path.join(BASE_DIR, "replays")
+REPLAY_PATH = os.path.join(REPLAY_DIR, "last_run.replay")
+
+# Profiling Settings
+PROFILER_HISTORY = 600 # Frames kept in the profiler ring buffer (10 s at 60 FPS)
+PROFILER_REFRESH_MS = 250 # How often the F3 panels re-render their text
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+CAPTURE_FRAMES = 120 # Frames covered by one cProfile capture (F5)
+CAPTURE_COOLDOWN = 600 # Frames after a capture before a slow frame or event can trigger another
@@ -0,0 +1,167 @@
+import math
+from settings import *
+
+EXACT_TICKS = 1024 # Delays up to this many ticks are summed step by step (see ticks())
+
+class Timer:
+    # One scheduled callback. `due` is the tick it fires on; `interval` (ms)
+    # re-arms it after each firing, 0 fires once. Cancel through
+    # TimerWheel.cancel().
+    __slots__ = ('due', 'interval', 'callback', 'args', 'active')
+
+    def __init__(self, due, interval, callback, args):
+        self.due = due
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+class TimerWheel:
+    # Hierarchical timer wheel on game-clock time, for cooldowns and timed
+    # effects (enemy shots, meteor spin, boss attacks, power-up expiry).
+    # Time is counted in whole simulation ticks (SIM_STEP_MS): a timer set
+    # for `ms` fires on the first tick where game-clock time is more than
+    # `ms` past the time it was set, the same float comparison as the
+    # `now - last > delay` checks it replaces (so runs and replays match
+    # them tick for tick). advance() is called once per tick.
+    #
+    # Level 0 has one slot per tick for the next 2**bits[0] ticks; each level
+    # above has slots spanning all of the level below, and a level's slot is
+    # re-sorted into the lower levels when the tick reaches it. Timers past
+    # the top level wait in an overflow list. advance() therefore only
+    # touches the timers that are due (plus an occasional cascade) instead of
+    # every entity checking its own cooldown every tick.
+    #
+    # Cancelling only flags the timer; it is dropped when its slot comes up.
+    # Each World owns one and passes it to the entities it creates.
+    def __init__(self, bits=TIMER_WHEEL_BITS, step_ms=SIM_STEP_MS):
+        self.step_ms = step_ms
+        self.shifts = []
+        self.masks = []
+        self.spans = [] # Ticks ahead each level reaches
+        shift = 0
+        for b in bits:
+            self.shifts.append(shift)
+            self.masks.append((1 << b) - 1)
+            shift += b
+            self.spans.append(1 << shift)
+        self.levels = [[[] for _ in range(1 << b)] for b in bits]
+        self.overflow = []
+        self.tick = 0
+        self.now_ms = 0.0 # Game-clock time at `tick`
+        self.pending = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.cascaded = 0
+
+    def clear(self):
+        # Drop every timer and restart at tick 0 (with the game clock)
+        # Deactivated so a late cancel() from a dropped entity is a no-op
+        for slots in self.levels + [[self.overflow]]:
+            for i, slot in enumerate(slots):
+                for timer in slot:
+                    timer.active = False
+                slots[i] = []
+        self.overflow = []
+        self.tick = 0
+        self.now_ms = 0.0
+        self.pending = 0
+
+    def ticks(self, ms):
+        # Ticks until the clock, stepping from now, is more than `ms` ahead.
+        # Summed step by step like GameClock does, since rounding decides
+        # whether e.g. 50 ms is 3 or 4 ticks; long delays just divide.
+        step = self.step_ms
+        if ms > step * EXACT_TICKS:
+            return math.floor(ms / step) + 1
+        start = t = self.now_ms
+        n = 0
+        while True:
+            t += step
+            n += 1
+            if t - start > ms:
+                return n
+
+    def after(self, delay_ms, callback, *args):
+        # Call callback(*args) once, delay_ms from now
+        return self._add(self.ticks(delay_ms), 0, callback, args)
+
+    def every(self, interval_ms, callback, *args):
+        # Call callback(*args) every interval_ms, timed from each firing
+        return self._add(self.ticks(interval_ms), interval_ms, callback, args)
+
+    def cancel(self, timer):
+        # Safe on None and on timers that already fired or were cancelled
+        if timer is not None and timer.active:
+            timer.active = False
+            self.pending -= 1
+            self.cancelled += 1
+
+    def _add(self, delay, interval, callback, args):
+        timer = Timer(self.tick + delay, interval, callback, args)
+        self._place(timer)
+        self.pending += 1
+        return timer
+
+    def _place(self, timer):
+        delta = timer.due - self.tick
+        for level, span in enumerate(self.spans):
+            if delta < span:
+                self.levels[level][(timer.due >> self.shifts[level]) & self.masks[level]].append(timer)
+                return
+        self.overflow.append(timer)
+
+    def _cascade(self, tick):
+        # At a level boundary, move the slot the tick just reached (and the
+        # overflow, at the top) down into the levels below, highest first
+        if tick & (self.spans[-1] - 1) == 0 and self.overflow:
+            waiting, self.overflow = self.overflow, []
+            self._replace(waiting)
+        for level in range(len(self.levels) - 1, 0, -1):
+            if tick & (self.spans[level - 1] - 1) == 0:
+                slots = self.levels[level]
+                i = (tick >> self.shifts[level]) & self.masks[level]
+                waiting, slots[i] = slots[i], []
+                self._replace(waiting)
+
+    def _replace(self, waiting):
+        for timer in waiting:
+            if timer.active:
+                self._place(timer)
+                self.cascaded += 1
+
+    def advance(self, now_ms):
+        # Fire everything due up to the tick game-clock time now_ms falls on,
+        # in tick order and, within a tick, in the order they were set
+        target = round(now_ms / self.step_ms)
+        self.now_ms = now_ms
+        slots = self.levels[0]
+        mask = self.masks[0]
+        while self.tick < target:
+            self.tick += 1
+            tick = self.tick
+            if tick & mask == 0:
+                self._cascade(tick)
+            expired = slots[tick & mask]
+            if not expired:
+                continue
+            slots[tick & mask] = []
+            for timer in expired:
+                if not timer.active:
+                    continue
+                if timer.interval:
+                    timer.due = tick + self.ticks(timer.interval)
+                    self._place(timer)
+                else:
+                    timer.active = False
+                    self.pending -= 1
+                self.fired += 1
+                timer.callback(*timer.args)
+
+    def stats(self):
+        return {
+            'pending': self.pending,
+            'fired': self.fired,
+            'cancelled': self.cancelled,
+            'cascaded': self.cascaded,
+        }
@@ -1,8 +1,144 @@
 import pygame
 import math
+from collections import OrderedDict
 from settings import *
 
+class TextCache:
+    # Pre-composited neon text (four faded glow copies plus the main text) keyed
+    # by (text, font, color, glow_color). Alignment only moves the blit, so it is
+    # not part of the key. Least recently used entries are evicted.
+    # Surfaces are premultiplied and must be blitted with BLEND_PREMULTIPLIED:
+    # a plain alpha blit would apply the glow alpha a second time and darken it
+    # (check_text.py compares against the old direct blits).
+    GLOW_OFFSETS = [(-2, -2), (2, 2), (-2, 2), (2, -2)]
+    GLOW_ALPHA = 100
+    PAD = 2
+
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, font, color, glow_color=None):
+        if glow_color is None:
+            glow_color = color
+        key = (text, font, color, glow_color)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = self._compose(text, font, color, glow_color)
+        self.cache[key] = surf
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def _compose(self, text, font, color, glow_color):
+        # Built premultiplied so the glow copies stack like the direct blits.
+        # copy() first: premul_alpha() garbles font surfaces with padded rows
+        text_surface = font.render(text, True, color).copy().premul_alpha()
+        glow_surf = font.render(text, True, glow_color).copy()
+        alpha = pygame.surfarray.pixels_alpha(glow_surf)
+        alpha[...] = alpha * (self.GLOW_ALPHA / 255)
+        del alpha
+        glow_surf = glow_surf.premul_alpha()
+        w, h = text_surface.get_size()
+        pad = self.PAD
+        surf = pygame.Surface((w + pad * 2, h + pad * 2), pygame.SRCALPHA)
+        for offset in self.GLOW_OFFSETS:
+            surf.blit(glow_surf, (pad + offset[0], pad + offset[1]), special_flags=pygame.BLEND_PREMULTIPLIED)
+        surf.blit(text_surface, (pad, pad), special_flags=pygame.BLEND_PREMULTIPLIED)
+        return surf
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hit_rate(), 3),
+        }
+
+text_cache = TextCache()
+
+class TintCache:
+    # Full-screen translucent overlays (menu dimming, pause, game over), one
+    # preallocated surface per RGBA tint, filled once and shared
+    def __init__(self):
+        self.overlays = {}
+
+    def get(self, rgba, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        key = (rgba, size)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(size, pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                overlay = overlay.convert_alpha()
+            overlay.fill(rgba)
+            self.overlays[key] = overlay
+        return overlay
+
+    def draw(self, surface, rgba):
+        return surface.blit(self.get(rgba, surface.get_size()), (0, 0))
+
+tints = TintCache()
+
+def draw_neon_text(surface, text, font, color, x, y, align="center", glow_color=None):
+    surf = text_cache.get(text, font, color, glow_color)
+    pad = TextCache.PAD
+    text_rect = pygame.Rect(0, 0, surf.get_width() - pad * 2, surf.get_height() - pad * 2)
+    if align == "nw":
+        text_rect.topleft = (x, y)
+    elif align == "ne":
+        text_rect.topright = (x, y)
+    elif align == "center":
+        text_rect.center = (x, y)
+    surface.blit(surf, (text_rect.x - pad, text_rect.y - pad), special_flags=pygame.BLEND_PREMULTIPLIED)
+    return text_rect
+
+class GlyphAtlas:
+    # Neon glyphs rendered once per character (plus any whole words, such as a
+    # fixed label), so changing numbers are composed with a few blits.
+    def __init__(self, font, color, chars="0123456789", words=()):
+        self.font = font
+        self.glyphs = {}
+        for token in list(chars) + list(words):
+            surf = text_cache.get(token, font, color)
+            self.glyphs[token] = (surf, font.size(token)[0])
+        self.height = font.get_height()
+
+    def width(self, tokens):
+        return sum(self.glyphs[t][1] for t in tokens)
+
+    def draw(self, surface, tokens, x, y, align="nw"):
+        # tokens: a string of atlas characters, or a list mixing words and characters
+        if align == "ne":
+            x -= self.width(tokens)
+        elif align == "center":
+            x -= self.width(tokens) // 2
+            y -= self.height // 2
+        pad = TextCache.PAD
+        for t in tokens:
+            surf, advance = self.glyphs[t]
+            surface.blit(surf, (x - pad, y - pad), special_flags=pygame.BLEND_PREMULTIPLIED)
+            x += advance
+
 class UIElement:
+    # draw() returns the rect it drew over (None if nothing), so widgets can
+    # be redrawn with partial display updates (see render.DirtyRegions)
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -23,6 +159,9 @@ class AnimatedText(UIElement):
         self.pulse_speed = pulse_speed
         self.pulse_val = 0
         self.scale_val = 1.0
+        # Rendered (text, glow) pairs per quantized scale step, for the current text
+        self.cached_text = None
+        self.scaled = {}
 
     def update(self):
         if self.pulse_speed > 0:
@@ -30,15 +169,28 @@ class AnimatedText(UIElement):
             # Pulse opacity or scale? Let's do scale for impact
             self.scale_val = 1.0 + (math.sin(self.pulse_val) * 0.05)
 
+    def _surfaces(self):
+        if self.text != self.cached_text:
+            self.cached_text = self.text
+            self.scaled = {}
+
+        step = round(self.scale_val / TEXT_SCALE_STEP) if self.pulse_speed > 0 else None
+        pair = self.scaled.get(step)
+        if pair is None:
+            # Render text, plus drop shadow / glow
+            text_surf = self.font.render(self.text, True, self.base_color)
+            glow_surf = self.font.render(self.text, True, (self.base_color[0]//2, self.base_color[1]//2, self.base_color[2]//2))
+            # Scaling
+            if step is not None:
+                scale = step * TEXT_SCALE_STEP
+                text_surf = pygame.transform.scale(text_surf, (int(text_surf.get_width() * scale), int(text_surf.get_height() * scale)))
+                glow_surf = pygame.transform.scale(glow_surf, (int(glow_surf.get_width() * scale), int(glow_surf.get_height() * scale)))
+            pair = (text_surf, glow_surf)
+            self.scaled[step] = pair
+        return pair
+
     def draw(self, surface):
-        # Render text
-        text_surf = self.font.render(self.text, True, self.base_color)
-        
-        # Scaling
-        if self.pulse_speed > 0:
-            w = int(text_surf.get_width() * self.scale_val)
-            h = int(text_surf.get_height() * self.scale_val)
-            text_surf = pygame.transform.scale(text_surf, (w, h))
+        text_surf, glow_surf = self._surfaces()
 
         rect = text_surf.get_rect()
         if self.align == "center":
@@ -48,21 +200,18 @@ class AnimatedText(UIElement):
         elif self.align == "ne":
             rect.topright = (self.x, self.y)
             
-        # Drop shadow / Glow
-        glow_surf = self.font.render(self.text, True, (self.base_color[0]//2, self.base_color[1]//2, self.base_color[2]//2))
-        if self.pulse_speed > 0:
-             w_g = int(glow_surf.get_width() * self.scale_val)
-             h_g = int(glow_surf.get_height() * self.scale_val)
-             glow_surf = pygame.transform.scale(glow_surf, (w_g, h_g))
-        
         glow_rect = glow_surf.get_rect(center=rect.center)
         glow_rect.x += 2
         glow_rect.y += 2
         
         surface.blit(glow_surf, glow_rect)
         surface.blit(text_surf, rect)
+        return rect.union(glow_rect)
 
 class Button(UIElement):
+    # Every look (normal, hover, pressed) is rendered once up front, label
+    # included, so drawing is a single blit. Call render() after changing
+    # the text or colors.
     def __init__(self, text, font, x, y, width=200, height=50, bg_color=DARK_BLUE, hover_color=BLUE, text_color=WHITE, action=None):
         super().__init__(x, y)
         self.text = text
@@ -79,6 +228,29 @@ class Button(UIElement):
         
         self.is_hovered = False
         self.click_animation = 0
+        self.render()
+
+    def render(self):
+        # Surfaces keyed by (hovered, pressed), all the size of the button
+        self.states = {}
+        for hovered in (False, True):
+            for pressed in (False, True):
+                self.states[(hovered, pressed)] = self._render_state(hovered, pressed)
+
+    def _render_state(self, hovered, pressed):
+        # Glass effect: translucent rounded box with a faint border
+        color = self.hover_color if hovered else self.bg_color
+        s = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        box = s.get_rect()
+        # Click effect
+        if pressed:
+            box.inflate_ip(-4, -4)
+        pygame.draw.rect(s, (*color, 200), box, border_radius=10)
+        pygame.draw.rect(s, (255, 255, 255, 100), box, 2, border_radius=10)
+
+        text_surf = self.font.render(self.text, True, self.text_color)
+        s.blit(text_surf, text_surf.get_rect(center=box.center))
+        return s
 
     def update(self):
         mouse_pos = pygame.mouse.get_pos()
@@ -97,30 +269,12 @@ class Button(UIElement):
         return False
 
     def draw(self, surface):
-        # Draw background with glass effect (alpha)
-        color = self.hover_color if self.is_hovered else self.bg_color
-        
-        # Click effect
-        draw_rect = self.rect.copy()
-        if self.click_animation > 0:
-             draw_rect.inflate_ip(-4, -4)
-
-        # Transparent surface
-        s = pygame.Surface((draw_rect.width, draw_rect.height), pygame.SRCALPHA)
-        # Rounded corners
-        pygame.draw.rect(s, (*color, 200), s.get_rect(), border_radius=10)
-        
-        # Border
-        pygame.draw.rect(s, (255, 255, 255, 100), s.get_rect(), 2, border_radius=10)
-        
-        surface.blit(s, draw_rect.topleft)
-        
-        # Text
-        text_surf = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=draw_rect.center)
-        surface.blit(text_surf, text_rect)
+        surface.blit(self.states[(self.is_hovered, self.click_animation > 0)], self.rect)
+        return self.rect
 
 class HealthBar(UIElement):
+    # The bar is kept as one surface and only re-rendered when the drawn
+    # fill width or color changes (the lerp settles on a whole pixel)
     def __init__(self, x, y, width, height, max_value=100, color=GREEN):
         super().__init__(x, y)
         self.width = width
@@ -129,6 +283,9 @@ class HealthBar(UIElement):
         self.current_value = max_value
         self.target_value = max_value
         self.color = color
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.rect = self.surface.get_rect(topleft=(x, y))
+        self.rendered = None # (fill width, color) on the surface
         
     def set_value(self, value):
         self.target_value = max(0, min(value, self.max_value))
@@ -138,22 +295,121 @@ class HealthBar(UIElement):
         self.current_value += (self.target_value - self.current_value) * 0.1
 
     def draw(self, surface):
-        # Background
-        bg_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        pygame.draw.rect(surface, (50, 50, 50), bg_rect, border_radius=5)
-        
-        # Foreground
         ratio = self.current_value / self.max_value
         fill_width = int(self.width * ratio)
-        fill_rect = pygame.Rect(self.x, self.y, fill_width, self.height)
-        
+
         # Color based on health?
         c = self.color
         if ratio < 0.3: c = RED
         elif ratio < 0.6: c = ORANGE
-        
-        pygame.draw.rect(surface, c, fill_rect, border_radius=5)
-        
+
+        if (fill_width, c) != self.rendered:
+            self.rendered = (fill_width, c)
+            self._render(fill_width, c)
+        surface.blit(self.surface, self.rect)
+        return self.rect
+
+    def _render(self, fill_width, color):
+        s = self.surface
+        s.fill((0, 0, 0, 0))
+        bg_rect = s.get_rect()
+        # Background
+        pygame.draw.rect(s, (50, 50, 50), bg_rect, border_radius=5)
+        # Foreground
+        pygame.draw.rect(s, color, (0, 0, fill_width, self.height), border_radius=5)
         # Border
-        pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=5)
+        pygame.draw.rect(s, WHITE, bg_rect, 2, border_radius=5)
+
+
+class DebugOverlay(UIElement):
+    # Toggleable (F3) text panel listing cache statistics. Each source is a
+    # (label, callable returning a dict) pair, polled only while visible.
+    # The panel is re-rendered every `refresh_ms` rather than every frame.
+    def __init__(self, font, x=10, y=90, refresh_ms=PROFILER_REFRESH_MS):
+        super().__init__(x, y)
+        self.font = font
+        self.visible = False
+        self.sources = []
+        self.refresh_ms = refresh_ms
+        self.panel = None
+        self.next_refresh = 0
+
+    def add_source(self, label, stats_fn):
+        self.sources.append((label, stats_fn))
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.panel = None
+
+    def lines(self):
+        out = []
+        for label, stats_fn in self.sources:
+            stats = stats_fn()
+            out.append(f"{label}: " + " ".join(f"{k}={v}" for k, v in stats.items()))
+        return out
+
+    def render_panel(self, lines):
+        line_h = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 10 if lines else 0
+        panel = pygame.Surface((width, line_h * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, NEON_GREEN), (5, 5 + i * line_h))
+        return panel
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        now = pygame.time.get_ticks()
+        if self.panel is None or now >= self.next_refresh:
+            self.next_refresh = now + self.refresh_ms
+            self.panel = self.render_panel(self.lines())
+        return surface.blit(self.panel, (self.x, self.y))
+
+class ProfilerOverlay(DebugOverlay):
+    # F3 companion panel for a FrameProfiler: the slowest phases averaged over
+    # the last `window` frames, and a graph of recent frame times against the
+    # 60 and 30 FPS budgets.
+    GRAPH_HEIGHT = 60
+    GRAPH_MS = 40 # Frame time at the top of the graph
+
+    def __init__(self, font, profiler, x=SCREEN_WIDTH - 270, y=90, rows=16, window=60, graph_frames=240):
+        super().__init__(font, x, y)
+        self.profiler = profiler
+        self.rows = rows
+        self.window = window
+        self.graph_frames = graph_frames
+
+    def lines(self):
+        totals, _ = self.profiler.recent(self.window)
+        if len(totals) == 0:
+            return ["profiler: collecting..."]
+        mean = float(totals.mean())
+        out = [f"frame {mean:.2f} ms avg  {float(totals.max()):.2f} max  ({len(totals)} frames)"]
+        stats = self.profiler.averages(self.window)
+        for name, avg, peak in stats[:self.rows]:
+            share = avg / mean * 100 if mean > 0 else 0
+            out.append(f"{name[:22]:22} {avg:6.3f} {peak:6.2f} {share:4.0f}%")
+        return out
+
+    def render_panel(self, lines):
+        text = super().render_panel(lines)
+        width = max(text.get_width(), 250)
+        panel = pygame.Surface((width, text.get_height() + self.GRAPH_HEIGHT + 5), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        panel.blit(text, (0, 0))
 
+        # Frame-time graph, newest frame on the right
+        top = text.get_height()
+        h = self.GRAPH_HEIGHT
+        scale = h / self.GRAPH_MS
+        for budget, color in ((1000 / 60, GREEN), (1000 / 30, ORANGE)):
+            y = top + h - int(budget * scale)
+            pygame.draw.line(panel, color, (0, y), (width, y))
+        totals, _ = self.profiler.recent(min(self.graph_frames, width))
+        x0 = width - len(totals)
+        for i, ms in enumerate(totals.tolist()):
+            bar = min(h, int(ms * scale))
+            color = NEON_GREEN if ms <= 1000 / 60 else (ORANGE if ms <= 1000 / 30 else RED)
+            pygame.draw.line(panel, color, (x0 + i, top + h), (x0 + i, top + h - bar))
+        return panel
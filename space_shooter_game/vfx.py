@@ -1,51 +1,254 @@
 import pygame
-import random
+import math
+import numpy as np
+from collections import OrderedDict
 from settings import *
+from rng import rng
 
-class Particle(pygame.sprite.Sprite):
-    def __init__(self, groups, pos, color, speed, radius, decay=0.2, vector=None):
-        super().__init__(groups)
-        self.pos = list(pos)
-        self.color = color
-        self.speed = speed
-        self.radius = radius
-        self.decay = decay
-        self.life = 255
-        
+class CircleSpriteCache:
+    # Pre-rendered filled circles keyed by (color, radius, quantized alpha), so
+    # particles and stars stop allocating a fresh SRCALPHA surface per draw.
+    # The optional "glow" variant is a soft radial falloff premultiplied into
+    # RGB on black, meant to be blitted with BLEND_ADD for the neon look.
+    def __init__(self, max_size=SPRITE_CACHE_SIZE, alpha_step=SPRITE_ALPHA_STEP):
+        self.max_size = max_size
+        self.alpha_step = alpha_step
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, alpha):
+        alpha = min(255, max(0, int(alpha)))
+        return (alpha + self.alpha_step // 2) // self.alpha_step
+
+    def get(self, color, radius, alpha, glow=False):
+        return self.get_level(color, radius, self.quantize(alpha), glow)
+
+    def get_level(self, color, radius, level, glow=False):
+        key = (color, radius, level, glow)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        alpha = min(255, level * self.alpha_step)
+        surf = self._build_glow(color, radius, alpha) if glow else self._build(color, radius, alpha)
+        self.cache[key] = surf
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def _build(self, color, r, alpha):
+        surf = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*color, alpha), (r, r), r)
+        return surf
+
+    def _build_glow(self, color, r, alpha):
+        # Twice the radius of the plain sprite, brightest in the middle
+        size = r * 2
+        surf = pygame.Surface((size * 2, size * 2))
+        rings = max(2, size)
+        for i in range(rings, 0, -1):
+            k = (1 - (i - 1) / rings) ** 2 * alpha / 255
+            ring_color = (int(color[0] * k), int(color[1] * k), int(color[2] * k))
+            pygame.draw.circle(surf, ring_color, (size, size), max(1, size * i // rings))
+        return surf
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+circle_sprites = CircleSpriteCache()
+
+class ParticleSystem:
+    # Structure-of-arrays particle store. Every live particle occupies one row of
+    # the preallocated NumPy arrays below (rows [0, count) are alive), so update
+    # is a handful of vectorized ops and dead rows are compacted in one pass.
+    # Drawing batches one Surface.blits call using cached circle sprites.
+    MAX_RADIUS = 64
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, glow=PARTICLE_GLOW):
+        self.capacity = 0
+        self.count = 0
+        self.pending = []
+        self.palette = []
+        self.palette_index = {}
+        self.glow = glow
+        self.seed(rng.fx.getrandbits(64))
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        pos = np.zeros((capacity, 2), np.float32)
+        vel = np.zeros((capacity, 2), np.float32)
+        life = np.zeros(capacity, np.float32)
+        decay = np.zeros(capacity, np.float32)
+        radius = np.zeros(capacity, np.int32)
+        color = np.zeros(capacity, np.int32)
+        if self.capacity:
+            n = self.count
+            pos[:n] = self.pos[:n]
+            vel[:n] = self.vel[:n]
+            life[:n] = self.life[:n]
+            decay[:n] = self.decay[:n]
+            radius[:n] = self.radius[:n]
+            color[:n] = self.color[:n]
+        self.pos, self.vel, self.life, self.decay = pos, vel, life, decay
+        self.radius, self.color = radius, color
+        self.capacity = capacity
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def _color_id(self, color):
+        cid = self.palette_index.get(color)
+        if cid is None:
+            # Ensure color is valid
+            if len(color) != 3:
+                return self._color_id(WHITE)
+            cid = len(self.palette)
+            self.palette.append(tuple(color))
+            self.palette_index[color] = cid
+        return cid
+
+    def seed(self, seed):
+        # burst() draws from its own NumPy generator; World.reset seeds it
+        # from rng.fx so explosions follow the run seed like emit() does
+        self.random = np.random.default_rng(seed)
+
+    def emit(self, pos, color, speed, radius, vector=None, decay=0.2):
+        # Same signature as the old create_particle callback. Emissions are
+        # buffered and copied into the arrays in bulk on the next update/draw.
         if vector:
-            self.direction = vector
+            dx, dy = vector.x, vector.y
         else:
             # Random direction
-            mx = random.uniform(-1, 1)
-            my = random.uniform(-1, 1)
-            self.direction = pygame.math.Vector2(mx, my).normalize()
+            dx = rng.fx.uniform(-1, 1)
+            dy = rng.fx.uniform(-1, 1)
+            length = math.hypot(dx, dy) or 1.0
+            dx, dy = dx / length, dy / length
+        self.pending.append((pos[0], pos[1], dx * speed, dy * speed, decay, radius, self._color_id(color)))
+
+    def burst(self, center, color, count, speed=(2, 6), radius=(3, 6), decay=0.2):
+        # Vectorized explosion: random directions, integer speed/radius ranges
+        if count <= 0:
+            return
+        self._flush()
+        self._reserve(count)
+        n = self.count
+        end = n + count
+        d = self.random.uniform(-1, 1, (count, 2)).astype(np.float32)
+        d /= np.maximum(np.hypot(d[:, 0], d[:, 1]), 1e-6)[:, None]
+        speeds = self.random.integers(speed[0], speed[1] + 1, count)
+        self.pos[n:end] = center
+        self.vel[n:end] = d * speeds[:, None]
+        self.life[n:end] = 255
+        self.decay[n:end] = decay * 10
+        self.radius[n:end] = self.random.integers(radius[0], radius[1] + 1, count)
+        self.color[n:end] = self._color_id(color)
+        self.count = end
+
+    def _flush(self):
+        if not self.pending:
+            return
+        rows = np.array(self.pending, np.float32)
+        self.pending = []
+        k = len(rows)
+        self._reserve(k)
+        n = self.count
+        end = n + k
+        self.pos[n:end] = rows[:, 0:2]
+        self.vel[n:end] = rows[:, 2:4]
+        self.life[n:end] = 255
+        self.decay[n:end] = rows[:, 4] * 10
+        self.radius[n:end] = rows[:, 5]
+        self.color[n:end] = rows[:, 6]
+        self.count = end
 
     def update(self):
-        # Move
-        self.pos[0] += self.direction.x * self.speed
-        self.pos[1] += self.direction.y * self.speed
-        
-        # Fade
-        self.life -= self.decay * 10
-        if self.life <= 0 or self.radius <= 0:
-            self.kill()
+        self._flush()
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= self.decay[:n]
+
+        # Fade out: compact survivors to the front of the arrays
+        alive = (self.life[:n] > 0) & (self.radius[:n] > 0)
+        if not alive.all():
+            idx = np.flatnonzero(alive)
+            k = len(idx)
+            self.pos[:k] = self.pos[idx]
+            self.vel[:k] = self.vel[idx]
+            self.life[:k] = self.life[idx]
+            self.decay[:k] = self.decay[idx]
+            self.radius[:k] = self.radius[idx]
+            self.color[:k] = self.color[idx]
+            self.count = k
+
+    def draw(self, surface, alpha=1.0):
+        surface.blits(self.blit_list(alpha), doreturn=False)
 
-    def draw(self, surface, offset=(0,0)):
-        if self.life > 0:
-            try:
-                # Create a surface for transparency
-                r = int(self.radius) if self.radius > 0 else 1
-                surf = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
-                
-                # Ensure color is valid
-                if len(self.color) != 3:
-                     self.color = (255, 255, 255)
-                     
-                alpha_color = (*self.color, min(255, max(0, int(self.life))))
-                pygame.draw.circle(surf, alpha_color, (r, r), r)
-                surface.blit(surf, (self.pos[0] - r + offset[0], self.pos[1] - r + offset[1]))
-            except Exception as e:
-                pass # Silently fail particle draw to avoid crash
+    def blit_list(self, alpha=1.0, scale=1.0):
+        # Surface.blits() items for every live particle.
+        # alpha: how far the frame is between the previous tick (0) and the last (1)
+        # scale: render scale of the target (positions and radii are resized)
+        self._flush()
+        n = self.count
+        if n == 0:
+            return []
+        pos = self.pos[:n]
+        if alpha < 1:
+            pos = pos - self.vel[:n] * (1 - alpha)
+        r = self.radius[:n]
+        if scale != 1:
+            pos = pos * scale
+            r = np.rint(r * scale).astype(np.int32)
+        r = np.clip(r, 1, self.MAX_RADIUS - 1)
+        step = circle_sprites.alpha_step
+        level = (np.clip(self.life[:n], 0, 255).astype(np.int32) + step // 2) // step
+        keys = (self.color[:n] * self.MAX_RADIUS + r) * 256 + level
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sprites = []
+        for k in unique.tolist():
+            cid, rest = divmod(k, self.MAX_RADIUS * 256)
+            radius, lvl = divmod(rest, 256)
+            sprites.append(circle_sprites.get_level(self.palette[cid], radius, lvl, self.glow))
+
+        # Glow sprites are twice as wide, so they are centered on 2r
+        half = r * 2 if self.glow else r
+        if RENDER_GROUP_BY_SOURCE:
+            # Grouped by sprite (stable, so each group keeps its draw order)
+            order = np.argsort(inverse, kind='stable')
+            pos, half, inverse = pos[order], half[order], inverse[order]
+        xs = (pos[:, 0] - half).astype(np.int32).tolist()
+        ys = (pos[:, 1] - half).astype(np.int32).tolist()
+        sources = map(sprites.__getitem__, inverse.tolist())
+        if self.glow:
+            return [(src, dest, None, pygame.BLEND_ADD) for src, dest in zip(sources, zip(xs, ys))]
+        return zip(sources, zip(xs, ys))
+
+    def clear(self):
+        self.pending = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count + len(self.pending)
 
 class ScreenShake:
     def __init__(self):
@@ -55,65 +258,143 @@ class ScreenShake:
     def shake(self, intensity=5, duration=10):
         self.intensity = intensity
         self.timer = duration
-        
-    def get_offset(self):
+
+    def update(self):
+        # Duration counts simulation ticks, not rendered frames
         if self.timer > 0:
             self.timer -= 1
-            ox = random.randint(-self.intensity, self.intensity)
-            oy = random.randint(-self.intensity, self.intensity)
+
+    def get_offset(self):
+        if self.timer > 0:
+            ox = rng.fx.randint(-self.intensity, self.intensity)
+            oy = rng.fx.randint(-self.intensity, self.intensity)
             return (ox, oy)
         return (0, 0)
 
-class Star(pygame.sprite.Sprite):
-    def __init__(self, groups):
-        super().__init__(groups)
-        self.x = random.randint(0, SCREEN_WIDTH)
-        self.y = random.randint(0, SCREEN_HEIGHT)
-        self.speed = random.uniform(0.5, 3.0)
-        self.radius = random.randint(1, 3)
-        self.color = random.choice([WHITE, CYAN, PURPLE])
-        # Brightness flicker
-        self.alpha = random.randint(100, 255)
-        self.alpha_change = random.choice([-2, 2])
+class Starfield:
+    # Parallax stars pre-rendered per depth layer. Each layer is drawn once into
+    # an 8-bit master tile whose palette index encodes (color, twinkle phase);
+    # twinkle keyframes are then baked by swapping the palette and converting to
+    # an RLE colorkey surface (SDL drops the raw pixels after encoding, so the
+    # frames are cheap). Per frame a layer costs two blits of the current frame.
+    COLORS = [WHITE, CYAN, PURPLE]
+
+    def __init__(self, count=STAR_COUNT, layers=STAR_LAYERS, phases=STAR_TWINKLE_PHASES,
+                 keyframes=STAR_TWINKLE_KEYFRAMES):
+        self.keyframes = keyframes
+        self.tick = 0
+        self.target = pygame.display.get_surface()
+        # Brightness bounces 100 -> 255 -> 100 at 2 per frame, as the old stars did
+        self.cycle = int(2 * (255 - 100) / 2)
+        palettes = self._palettes(phases, keyframes)
+
+        self.layers = []
+        self.scaled = {} # scale -> per-layer frames resized for that render scale
+        speed_min, speed_max = 0.5, 3.0
+        band = (speed_max - speed_min) / layers
+        speeds = [rng.fx.uniform(speed_min, speed_max) for _ in range(count)]
+        for i in range(layers):
+            low = speed_min + band * i
+            master = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), 0, 8)
+            master.set_palette(palettes[0])
+            master.fill(0)
+            for speed in speeds:
+                if min(int((speed - speed_min) / band), layers - 1) == i:
+                    self._draw_star(master, phases)
+            self.layers.append({'frames': self._bake(master, palettes), 'speed': low + band / 2, 'y': 0.0})
+
+    def _palettes(self, phases, keyframes):
+        # One 256-entry palette per keyframe; index 0 stays black (transparent)
+        t = np.arange(keyframes)[:, None] / keyframes + np.arange(phases)[None, :] / phases
+        tri = 1 - np.abs(2 * (t % 1.0) - 1)
+        k = (100 + tri * 155) / 255
+        palettes = []
+        for row in k:
+            palette = [BLACK]
+            for color in self.COLORS:
+                for v in row.tolist():
+                    palette.append((int(color[0] * v), int(color[1] * v), int(color[2] * v)))
+            palettes.append(palette + [BLACK] * (256 - len(palette)))
+        return palettes
+
+    def _bake(self, master, palettes):
+        frames = []
+        for palette in palettes:
+            master.set_palette(palette)
+            frame = master.convert() if self.target else master.copy()
+            frame.set_colorkey(BLACK, pygame.RLEACCEL)
+            self._encode(frame, self.target)
+            frames.append(frame)
+        return frames
+
+    def _encode(self, frame, target):
+        # SDL RLE-encodes a surface (and frees its raw pixels) on the first blit
+        # to a given destination. Do it now rather than spread over gameplay.
+        if target:
+            target.blit(frame, (0, 0), (0, 0, 1, 1))
+
+    def _warm(self, target):
+        self.target = target
+        for layer in self.layers:
+            for frame in layer['frames']:
+                self._encode(frame, target)
+        for frames in self.scaled.values():
+            for layer_frames in frames:
+                for frame in layer_frames:
+                    self._encode(frame, target)
+
+    def _draw_star(self, surf, phases):
+        x = rng.fx.randint(0, SCREEN_WIDTH)
+        y = rng.fx.randint(0, SCREEN_HEIGHT)
+        radius = rng.fx.randint(1, 3)
+        index = 1 + rng.fx.randrange(len(self.COLORS)) * phases + rng.fx.randrange(phases)
+        # Draw wrapped copies so the tile scrolls seamlessly
+        for wrap in (-SCREEN_HEIGHT, 0, SCREEN_HEIGHT):
+            pygame.draw.circle(surf, index, (x, y + wrap), radius)
 
     def update(self):
-        self.y += self.speed
-        if self.y > SCREEN_HEIGHT:
-            self.y = -10
-            self.x = random.randint(0, SCREEN_WIDTH)
-            
-        # Flicker
-        self.alpha += self.alpha_change
-        
-        # Clamp alpha in update logic too, just to be safe
-        if self.alpha >= 255:
-            self.alpha = 255
-            self.alpha_change *= -1
-        elif self.alpha <= 100:
-            self.alpha = 100
-            self.alpha_change *= -1
-
-    def draw(self, surface, offset=(0,0)):
-        # Allow drawing with offset for shake
-        pos = (int(self.x + offset[0]), int(self.y + offset[1]))
-        if 0 <= pos[0] <= SCREEN_WIDTH and 0 <= pos[1] <= SCREEN_HEIGHT:
-            try:
-                surf = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-                
-                # Ensure alpha is valid for drawing
-                # Although we clamp in update, let's double check here
-                a = min(255, max(0, int(self.alpha)))
-                
-                # Ensure color
-                c = self.color
-                if len(c) != 3: c = (255, 255, 255)
-                
-                # Draw
-                pygame.draw.circle(surf, (*c, a), (self.radius, self.radius), self.radius)
-                surface.blit(surf, (pos[0]-self.radius, pos[1]-self.radius))
-            except Exception as e:
-                # Log but don't crash
-                 print(f"Star Draw Error: {e}")
+        self.tick += 1
+        for layer in self.layers:
+            layer['y'] = (layer['y'] + layer['speed']) % SCREEN_HEIGHT
+
+    def draw(self, surface, alpha=1.0):
+        surface.blits(self.blit_list(surface, alpha), doreturn=False)
+
+    def blit_list(self, surface, alpha=1.0, scale=1.0):
+        # Surface.blits() items for drawing the stars onto `surface`, which is
+        # drawn at render scale `scale`
+        if surface is not self.target:
+            self._warm(surface)
+        frame = (self.tick * self.keyframes // self.cycle) % self.keyframes
+        frames = self._frames(scale)
+        height = int(round(SCREEN_HEIGHT * scale))
+        blits = []
+        for layer, layer_frames in zip(self.layers, frames):
+            surf = layer_frames[frame]
+            y = int((layer['y'] - layer['speed'] * (1 - alpha)) % SCREEN_HEIGHT * scale)
+            blits.append((surf, (0, y)))
+            blits.append((surf, (0, y - height)))
+        return blits
+
+    def _frames(self, scale):
+        # Every layer's keyframes at `scale`, resized (and RLE encoded) once
+        if scale == 1:
+            return [layer['frames'] for layer in self.layers]
+        frames = self.scaled.get(scale)
+        if frames is None:
+            size = (int(round(SCREEN_WIDTH * scale)), int(round(SCREEN_HEIGHT * scale)))
+            frames = []
+            for layer in self.layers:
+                resized = []
+                for frame in layer['frames']:
+                    # Nearest-neighbour: filtering would blend stars into the colorkey
+                    small = pygame.transform.scale(frame, size)
+                    small.set_colorkey(BLACK, pygame.RLEACCEL)
+                    self._encode(small, self.target)
+                    resized.append(small)
+                frames.append(resized)
+            self.scaled[scale] = frames
+        return frames
 
 class BackgroundObject(pygame.sprite.Sprite):
     def __init__(self, groups, image_type='planet'):
@@ -121,30 +402,30 @@ class BackgroundObject(pygame.sprite.Sprite):
         self.image_type = image_type
         
         # Random size and speed for parallax
-        self.z_depth = random.uniform(0.2, 0.8) # 0.2 is far/slow, 0.8 is near/faster
-        size = int(random.randint(50, 150) * self.z_depth)
+        self.z_depth = rng.fx.uniform(0.2, 0.8) # 0.2 is far/slow, 0.8 is near/faster
+        size = int(rng.fx.randint(50, 150) * self.z_depth)
         self.speed = 1.0 * self.z_depth
         
         self.image = pygame.Surface((size, size), pygame.SRCALPHA)
         
         if image_type == 'planet':
             # Draw a planet
-            color = random.choice([(100, 100, 200), (200, 100, 100), (100, 200, 100), (150, 150, 150)])
+            color = rng.fx.choice([(100, 100, 200), (200, 100, 100), (100, 200, 100), (150, 150, 150)])
             pygame.draw.circle(self.image, color, (size//2, size//2), size//2)
             # Add some shading?
             pygame.draw.circle(self.image, (0,0,0, 50), (size//2 + 10, size//2 + 10), size//2 - 5)
             
         elif image_type == 'nebula':
             # Draw a cloud-like blob
-            color = random.choice([(100, 0, 100, 50), (0, 0, 100, 50), (100, 0, 0, 50)])
+            color = rng.fx.choice([(100, 0, 100, 50), (0, 0, 100, 50), (100, 0, 0, 50)])
             for _ in range(5):
-                cx = random.randint(0, size)
-                cy = random.randint(0, size)
-                cr = random.randint(size//4, size//2)
+                cx = rng.fx.randint(0, size)
+                cy = rng.fx.randint(0, size)
+                cr = rng.fx.randint(size//4, size//2)
                 pygame.draw.circle(self.image, color, (cx, cy), cr)
         
         self.rect = self.image.get_rect()
-        self.rect.x = random.randint(0, SCREEN_WIDTH - size)
+        self.rect.x = rng.fx.randint(0, SCREEN_WIDTH - size)
         self.rect.y = -size - 50
         
     def update(self):
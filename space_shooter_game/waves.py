@@ -0,0 +1,253 @@
+import json
+import math
+import os
+from bisect import bisect_right
+from collections import namedtuple
+from operator import attrgetter
+from settings import *
+
+# One scheduled spawn. `time` is ms since the wave started (wave clock, which
+# stops while a boss is up); `kind` is an enemy type, 'random' (the enemy
+# rolls its own type) or 'meteor'; `x`/`y` are the sprite's center x and top
+# y, or None to let it pick its own random position.
+Spawn = namedtuple('Spawn', 'time kind x y')
+
+SPAWN_KINDS = ('basic', 'shooter', 'chaser', 'tank', 'random', 'meteor')
+FORMATIONS = ('random', 'line', 'column', 'v')
+
+# Wave scripts are JSON files (see assets/waves/):
+#   {"waves": [wave, ...], "endless": wave}
+# A wave is {"name", "groups": [group, ...], "rest"}: after its last spawn
+# and once the screen is clear, the next wave starts `rest` ms later
+# (default WAVE_REST_DURATION). "endless" is optional and loops after the
+# last wave, without clearing or resting, every "period" ms (default: the
+# time of its last spawn).
+# A group spawns `count` enemies in steps of `burst`, one step every `rate`
+# ms starting at `start` (default: one `rate` in):
+#   "type": "basic" | "shooter" | "chaser" | "tank" | "random" | "meteor"
+#   "mix":  {"basic": 3, "chaser": 1} instead of "type"; weights are dealt
+#           out evenly (no randomness), so a 3:1 mix spawns b b c b b b c b...
+#   "formation": "random" (default), "line" across the screen, or "column"
+#           / "v" around "x" (0-1 of the screen width, default 0.5), rows
+#           "spacing" px apart (default 60, at most the screen width)
+# Every number is checked when the script loads: anything missing its
+# type or range raises WaveScriptError naming the wave and group.
+# Scripts are compiled once at load time into one sorted Spawn timeline per
+# wave; WaveManager then only moves a cursor along it.
+
+class WaveScriptError(ValueError):
+    pass
+
+Wave = namedtuple('Wave', 'name timeline times rest period')
+
+def _object(value, what, where):
+    if not isinstance(value, dict):
+        raise WaveScriptError(f"{where}: {what} must be an object, not {value!r}")
+    return value
+
+def _number(data, key, default, where, low=0, high=None, whole=False):
+    # data[key] (or default) as an int (whole) or float within [low, high]
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise WaveScriptError(f"{where}: {key} must be a number, not {value!r}")
+    if whole and value != int(value):
+        raise WaveScriptError(f"{where}: {key} must be a whole number, not {value!r}")
+    if value < low or (high is not None and value > high):
+        limit = f"between {low} and {high}" if high is not None else f"at least {low}"
+        raise WaveScriptError(f"{where}: {key} must be {limit}, not {value!r}")
+    return int(value) if whole else float(value)
+
+def _deal(mix, count):
+    # Smooth weighted round robin: the kinds in `mix` spread evenly over `count` picks
+    kinds = sorted(mix)
+    weights = [mix[k] for k in kinds]
+    total = sum(weights)
+    current = [0] * len(kinds)
+    picks = []
+    for _ in range(count):
+        for i, w in enumerate(weights):
+            current[i] += w
+        best = max(range(len(kinds)), key=current.__getitem__)
+        current[best] -= total
+        picks.append(kinds[best])
+    return picks
+
+def _formation(shape, n, x, spacing):
+    # (center x, top y) for each of `n` sprites spawned together
+    top = -60
+    if shape == 'random':
+        return [(None, None)] * n
+    if shape == 'line':
+        return [(SCREEN_WIDTH * (i + 1) // (n + 1), top) for i in range(n)]
+    cx = int(SCREEN_WIDTH * x)
+    if shape == 'column':
+        return [(cx, top - i * spacing) for i in range(n)]
+    # 'v': the first sprite leads, the rest trail off to alternate sides
+    points = []
+    for i in range(n):
+        row = (i + 1) // 2
+        side = -1 if i % 2 else 1
+        points.append((cx + side * row * spacing, top - row * spacing))
+    return points
+
+def _compile_group(group, where):
+    _object(group, "a group", where)
+    if 'mix' in group:
+        mix = _object(group['mix'], "mix", where)
+        if not mix or any(k not in SPAWN_KINDS for k in mix):
+            raise WaveScriptError(f"{where}: bad mix {mix!r}")
+        for kind in mix:
+            if _number(mix, kind, None, f"{where} mix", low=0) == 0:
+                raise WaveScriptError(f"{where}: mix weight for {kind} must be above 0")
+    else:
+        kind = group.get('type')
+        if kind not in SPAWN_KINDS:
+            raise WaveScriptError(f"{where}: type must be one of {', '.join(SPAWN_KINDS)}, not {kind!r}")
+        mix = {kind: 1}
+    count = _number(group, 'count', 1, where, whole=True)
+    burst = _number(group, 'burst', 1, where, low=1, whole=True)
+    rate = _number(group, 'rate', 1000, where)
+    start = _number(group, 'start', rate, where)
+    shape = group.get('formation', 'random')
+    if shape not in FORMATIONS:
+        raise WaveScriptError(f"{where}: formation must be one of {', '.join(FORMATIONS)}, not {shape!r}")
+    spacing = _number(group, 'spacing', 60, where, high=SCREEN_WIDTH)
+    x = _number(group, 'x', 0.5, where, high=1)
+
+    kinds = _deal(mix, count)
+    spawns = []
+    for step in range(math.ceil(count / burst)):
+        time = start + step * rate
+        members = kinds[step * burst:(step + 1) * burst]
+        for kind, (px, py) in zip(members, _formation(shape, len(members), x, spacing)):
+            spawns.append(Spawn(time, kind, px, py))
+    return spawns
+
+def _compile_wave(data, where, default_name):
+    _object(data, "a wave", where)
+    groups = data.get('groups')
+    if not groups or not isinstance(groups, list):
+        raise WaveScriptError(f"{where}: a wave needs a list of at least one group")
+    spawns = []
+    for i, group in enumerate(groups):
+        spawns += _compile_group(group, f"{where} group {i + 1}")
+    # Stable: spawns due at the same time keep their group order
+    timeline = tuple(sorted(spawns, key=attrgetter('time')))
+    times = [spawn.time for spawn in timeline]
+    period = _number(data, 'period', max(times[-1] if times else 1000, 1.0), where, low=1)
+    return Wave(str(data.get('name', default_name)), timeline, times,
+                _number(data, 'rest', WAVE_REST_DURATION, where), period)
+
+class WaveScript:
+    # A compiled wave script: `waves` in order, then `endless` (or None)
+    def __init__(self, data, source="<script>"):
+        self.source = source
+        waves = _object(data, "the script", source).get('waves')
+        if not waves or not isinstance(waves, list):
+            raise WaveScriptError(f"{source}: no waves")
+        self.waves = [_compile_wave(wave, f"{source} wave {i + 1}", f"Wave {i + 1}")
+                      for i, wave in enumerate(waves)]
+        endless = data.get('endless')
+        self.endless = _compile_wave(endless, f"{source} endless", "WAVE ∞") if endless else None
+
+    def spawn_count(self):
+        return sum(len(wave.timeline) for wave in self.waves)
+
+_scripts = {}
+
+def load_script(path=WAVE_SCRIPT):
+    # Parsed and compiled once per file
+    script = _scripts.get(path)
+    if script is None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e: # ValueError: bad JSON or encoding
+            raise WaveScriptError(f"can't load wave script {path}: {e}") from e
+        script = _scripts[path] = WaveScript(data, os.path.basename(path))
+    return script
+
+class WaveManager:
+    # Plays a WaveScript. Each wave runs on its own clock (ms since it
+    # started), which stops while a boss is up; update() returns every Spawn
+    # that has come due since the last call, in order, so a tick can spawn
+    # any number of enemies. `clock` is the World's GameClock.
+    def __init__(self, clock, script=None):
+        self.clock = clock
+        self.script = script or load_script()
+        self.reset()
+
+    def reset(self):
+        self.wave_index = 0
+        self.wave = self.script.waves[0]
+        self.infinite_mode = False
+        self.state = "SPAWNING" # SPAWNING, CLEARING, RESTING
+        self.spawned_count = 0 # Cursor into the wave's timeline
+        self.time = 0.0
+        self.last_time = self.clock.get_ticks()
+        self.rest_start_time = 0
+
+    def update(self, current_time, active_mobs_count, active_boss):
+        elapsed = current_time - self.last_time
+        self.last_time = current_time
+        if active_boss:
+            return () # Pause everything
+        self.time += elapsed
+
+        if self.infinite_mode:
+            return self._loop()
+
+        if self.state == "SPAWNING":
+            spawns = self._due()
+            if self.spawned_count == len(self.wave.timeline):
+                self.state = "CLEARING"
+            return spawns
+
+        if self.state == "CLEARING":
+            if active_mobs_count == 0:
+                self.state = "RESTING"
+                self.rest_start_time = self.time
+
+        elif self.state == "RESTING":
+            if self.time - self.rest_start_time > self.wave.rest:
+                self.next_wave()
+
+        return ()
+
+    def _due(self):
+        # Advance the cursor past everything due by now
+        start = self.spawned_count
+        end = bisect_right(self.wave.times, self.time, start)
+        self.spawned_count = end
+        return self.wave.timeline[start:end]
+
+    def _loop(self):
+        wave = self.wave
+        if wave is None:
+            return ()
+        spawns = []
+        while True:
+            spawns += self._due()
+            if self.spawned_count < len(wave.timeline) or self.time < wave.period:
+                return spawns
+            # Period over: go round again
+            self.time -= wave.period
+            self.spawned_count = 0
+
+    def next_wave(self):
+        self.wave_index += 1
+        self.state = "SPAWNING"
+        self.spawned_count = 0
+        self.time = 0.0
+        if self.wave_index >= len(self.script.waves):
+            self.infinite_mode = True
+            self.wave = self.script.endless
+        else:
+            self.wave = self.script.waves[self.wave_index]
+
+    def get_info(self):
+        if self.infinite_mode:
+            return self.wave.name if self.wave else "WAVE ∞"
+        if self.state == "RESTING":
+            return "WAVE COMPLETE"
+        return f"{self.wave.name} ({self.spawned_count}/{len(self.wave.timeline)})"
@@ -0,0 +1,359 @@
+import pygame
+from settings import *
+from player import Player
+from enemy import Enemy, EnemyBullet, Boss, Meteor, ENEMY_LOOKS, enemy_bullet_pool
+from bullet import Bullet, bullet_pool
+from powerups import PowerUp, powerup_pool
+from collision import SpatialHash
+from waves import WaveManager, load_script
+from gameclock import GameClock
+from timers import TimerWheel
+from rng import rng
+from profiler import profiler
+from assets import rotations
+
+def preload_images():
+    # Decode and pre-scale every sprite image up front so spawning never hits the disk
+    Player.get_image()
+    Bullet.get_image()
+    Boss.get_image()
+    for enemy_type in ENEMY_LOOKS:
+        Enemy.get_image(enemy_type)
+    for size in range(METEOR_MIN_SIZE, METEOR_MAX_SIZE + 1, METEOR_SIZE_BUCKET):
+        Meteor.get_frames(Meteor.size_bucket(size))
+    rotations.prebuild('bullet', Bullet.get_image())
+    rotations.prebuild('enemy_bullet', EnemyBullet.get_image())
+    for power_type in POWERUP_COLORS:
+        PowerUp.get_image(power_type)
+
+def prefill_pools():
+    bullet_pool.prefill(0, 0)
+    enemy_bullet_pool.prefill(0, 0)
+    powerup_pool.prefill((0, 0))
+
+class World:
+    # The game simulation: waves, enemies, boss, collisions and scoring, with
+    # no window, sound or frame cap of its own. Each update() advances one tick
+    # using the (move, target_pos) command from a controller.
+    #
+    # Things only the front end cares about are reported through `events`,
+    # refilled every tick:
+    #   ('sound', 'shoot' | 'explosion')
+    #   ('shake', intensity, duration)
+    #   ('gameover',)
+    #   ('wave', wave_index)    a new wave started
+    #   ('powerup',)            a power-up spawned
+    #   ('boss_killed',)
+    # Particles are optional: pass a ParticleSystem to get explosions and
+    # engine trails, or None to skip them entirely (headless runs).
+    # What spawns when comes from the wave script (JSON, see waves.py).
+    # With interpolate=True every tick first records each sprite's center in
+    # prev_centers, so the renderer can draw between the last two ticks.
+    # Each World has its own clock and timer wheel (passed to the entities
+    # it creates), but the random streams (rng.py) and the sprite pools are
+    # process-wide: only one World should be simulating at a time.
+    def __init__(self, particles=None, interpolate=False, wave_script=WAVE_SCRIPT):
+        self.particles = particles
+        self.interpolate = interpolate
+        self.prev_centers = {}
+        self.clock = GameClock()
+        self.timers = TimerWheel()
+        self.wave_manager = WaveManager(self.clock, load_script(wave_script))
+        self.collisions = SpatialHash()
+        self.events = []
+
+        # Groups
+        self.all_sprites = pygame.sprite.Group()
+        self.mobs = pygame.sprite.Group()
+        self.bullets = pygame.sprite.Group()
+        self.powerups = pygame.sprite.Group()
+        self.enemy_bullets = pygame.sprite.Group()
+        self.boss_group = pygame.sprite.Group() # New group for Boss
+        self.meteors = pygame.sprite.Group() # Separate group for meteors
+
+        self.reset()
+
+    def reset(self, seed=None):
+        # A seed re-seeds every random stream, making the run reproducible
+        # from its seed and inputs (see replay.py)
+        if seed is not None:
+            rng.seed(seed)
+        self.seed = rng.seed_value
+        # Killing returns every pooled object to its pool (and removes it from all groups)
+        for pool in (bullet_pool, enemy_bullet_pool, powerup_pool):
+            pool.release_all()
+            pool.shrink()
+        for group in (self.all_sprites, self.mobs, self.bullets, self.powerups,
+                      self.enemy_bullets, self.boss_group, self.meteors):
+            group.empty()
+        if self.particles is not None:
+            self.particles.clear()
+            self.particles.seed(rng.fx.getrandbits(64))
+
+        self.clock.reset()
+        self.timers.clear()
+        self.player = Player(self.timers)
+        self.all_sprites.add(self.player)
+        self.score = 0
+        self.game_over = False
+        self.events = []
+        self.prev_centers = {}
+
+        # Boss Logic
+        self.boss_active = False
+        self.boss = None
+        self.next_boss_score = BOSS_SPAWN_SCORE
+
+        # Counters for balancing runs
+        self.ticks = 0
+        self.kills = 0
+        self.bosses_killed = 0
+        self.hits_taken = 0
+
+        self.wave_manager.reset()
+
+    # Callbacks
+    def fire_bullet(self, x, y, direction=None):
+        b = bullet_pool.acquire(x, y, direction)
+        if b is None:
+            return # Pool at its cap (see Pool)
+        self.bullets.add(b)
+        self.all_sprites.add(b)
+
+    def spawn(self, spawn):
+        # One wave script entry (see waves.Spawn)
+        if spawn.kind == 'meteor':
+            sprite = Meteor(self.timers)
+            self.meteors.add(sprite)
+        else:
+            sprite = Enemy(self.timers, self.score, enemy_type=None if spawn.kind == 'random' else spawn.kind)
+            self.mobs.add(sprite)
+        if spawn.x is not None:
+            sprite.rect.centerx = spawn.x
+            sprite.rect.y = spawn.y
+            if spawn.kind != 'meteor':
+                sprite.pos_x = float(sprite.rect.x)
+                sprite.pos_y = float(sprite.rect.y)
+        self.all_sprites.add(sprite)
+
+    def spawn_powerup(self, center):
+        p = powerup_pool.acquire(center)
+        if p is None:
+            return
+        self.all_sprites.add(p)
+        self.powerups.add(p)
+        self.events.append(('powerup',))
+
+    def spawn_explosion(self, center, color=ORANGE, count=15):
+        if self.particles is not None:
+            self.particles.burst(center, color, count, speed=(2, 6), radius=(3, 6))
+
+    def emit(self, pos, color, speed, radius, vector=None):
+        if self.particles is not None:
+            self.particles.emit(pos, color, speed, radius, vector=vector)
+
+    def shake(self, intensity, duration):
+        self.events.append(('shake', intensity, duration))
+
+    def sound(self, name):
+        self.events.append(('sound', name))
+
+    def add_score(self, points):
+        self.score += points
+
+    def player_hit(self, center, color, count, shake):
+        # Shared by enemy bullets, meteors and mobs hitting an unshielded player
+        self.player.lives -= 1
+        self.hits_taken += 1
+        self.sound('explosion')
+        self.spawn_explosion(center, color, count)
+        self.shake(shake, shake)
+        if self.player.lives <= 0:
+            self.end_game()
+
+    def end_game(self):
+        self.game_over = True
+        self.spawn_explosion(self.player.rect.center, CYAN, 50)
+        self.events.append(('gameover',))
+
+    def update(self, move=0, target_pos=None):
+        self.events = []
+        if self.game_over:
+            return
+        self.ticks += 1
+        current_time = self.clock.get_ticks()
+        if self.interpolate:
+            prev = {sprite: sprite.rect.center for sprite in self.all_sprites}
+            prev.update((b, b.rect.center) for b in self.enemy_bullets)
+            self.prev_centers = prev
+            profiler.mark('interpolation')
+        player = self.player
+
+        # Due cooldowns and timed effects (shots, meteor spin, boss attacks, power-ups)
+        self.timers.advance(current_time)
+        profiler.mark('timers')
+
+        # Wave Logic
+        active_mobs_count = len(self.mobs) + len(self.meteors)
+        wave_index = self.wave_manager.wave_index
+        spawns = self.wave_manager.update(current_time, active_mobs_count, self.boss_active)
+        if self.wave_manager.wave_index != wave_index:
+            self.events.append(('wave', self.wave_manager.wave_index))
+        for spawn in spawns or ():
+            self.spawn(spawn)
+
+        # Check Boss Spawn
+        if self.score >= self.next_boss_score and not self.boss_active:
+            self.boss_active = True
+            self.boss = Boss(self.timers)
+            self.boss_group.add(self.boss)
+            self.all_sprites.add(self.boss)
+        profiler.mark('waves')
+
+        # Auto-fire
+        if player.shoot(current_time, self.bullets, self.fire_bullet, target_pos=target_pos):
+            self.sound('shoot')
+
+        player.update(move, self.emit if self.particles is not None else None)
+        profiler.mark('player')
+        self.mobs.update(player.rect, self.enemy_bullets)
+        profiler.mark('update_mobs')
+        self.meteors.update()
+        profiler.mark('update_meteors')
+        self.boss_group.update(self.enemy_bullets) # Boss updates with bullet group
+        profiler.mark('update_boss')
+        self.bullets.update()
+        profiler.mark('update_bullets')
+        self.enemy_bullets.update()
+        profiler.mark('update_enemy_bullets')
+        self.powerups.update()
+        profiler.mark('update_powerups')
+
+        self.check_collisions()
+
+    def check_collisions(self):
+        player = self.player
+        collisions = self.collisions
+
+        # Broadphase: index everything once, shared by all queries below
+        collisions.begin_frame()
+
+        # Collisions: Player <-> Powerups
+        hits = collisions.spritecollide(player, self.powerups, True)
+        for hit in hits:
+            player.powerup(hit.type)
+        profiler.mark('collide_powerups')
+
+        # Check Player <-> Enemy Bullet Collision
+        hits = collisions.spritecollide(player, self.enemy_bullets, True)
+        for hit in hits:
+            if player.has_shield:
+                self.spawn_explosion(hit.rect.center, BLUE, 10)
+            else:
+                self.player_hit(hit.rect.center, RED, 10, 5)
+        profiler.mark('collide_enemy_bullets')
+
+        # Collisions: Bullet <-> Enemy
+        hits = collisions.groupcollide(self.mobs, self.bullets, False, True)
+        for enemy, hit_bullets in hits.items():
+            for b in hit_bullets:
+                self.add_score(10)
+                self.emit(b.rect.center, ORANGE, 2, 2)
+
+                if enemy.take_damage(1):
+                    self.add_score(90)
+                    self.kills += 1
+                    enemy.kill()
+
+                    self.sound('explosion')
+                    self.spawn_explosion(enemy.rect.center, ORANGE)
+                    self.shake(5, 5)
+
+                    if rng.powerup.random() < POWERUP_SPAWN_CHANCE:
+                        self.spawn_powerup(enemy.rect.center)
+
+            if self.score >= 3500:
+                player.bullet_count = 5
+        profiler.mark('collide_bullets_mobs')
+
+        # Handle Meteors Collision with Bullets
+        hits = collisions.groupcollide(self.meteors, self.bullets, False, True)
+        for m, hit_bullets in hits.items():
+            for b in hit_bullets:
+                self.emit(b.rect.center, (100, 100, 100), 2, 2)
+        profiler.mark('collide_bullets_meteors')
+
+        # Collisions: Player <-> Meteors
+        hits = collisions.spritecollide(player, self.meteors, True)
+        for hit in hits:
+            if player.has_shield:
+                self.spawn_explosion(hit.rect.center, BLUE, 30)
+                self.shake(10, 10)
+            else:
+                self.player_hit(hit.rect.center, (139, 69, 19), 30, 20)
+        profiler.mark('collide_player_meteors')
+
+        # Collision: Bullet <-> Boss
+        if self.boss_active:
+            boss_hits = collisions.groupcollide(self.boss_group, self.bullets, False, True)
+            for boss, hit_bullets in boss_hits.items():
+                for b in hit_bullets:
+                    # Damage Boss
+                    if boss.state == "FIGHTING": # Invulnerable while entering
+                        self.emit(b.rect.center, PURPLE, 2, 2)
+                        if boss.take_damage(1):
+                            self.add_score(5000)
+                            self.bosses_killed += 1
+                            boss.kill()
+                            self.boss_active = False
+                            self.next_boss_score += 5000
+                            self.spawn_explosion(boss.rect.center, MAGENTA, 100)
+                            self.shake(20, 30)
+                            self.sound('explosion')
+                            self.events.append(('boss_killed',))
+
+                            # Spawn a guaranteed powerup
+                            self.spawn_powerup(boss.rect.center)
+        profiler.mark('collide_bullets_boss')
+
+        # Collisions: Player <-> Mobs
+        hits = collisions.spritecollide(player, self.mobs, True)
+        for hit in hits:
+            if player.has_shield:
+                self.spawn_explosion(hit.rect.center, BLUE, 20)
+                self.shake(5, 5)
+            else:
+                self.player_hit(hit.rect.center, RED, 20, 15)
+        profiler.mark('collide_player_mobs')
+
+        # Collisions: Player <-> Boss Body
+        if self.boss_active:
+            hits = collisions.spritecollide(player, self.boss_group, False)
+            if hits:
+                if not player.has_shield:
+                    # Instakill
+                    player.lives = 0
+                    self.hits_taken += 1
+                    self.end_game()
+                else:
+                    # Shield breaks instantly on the boss
+                    player.has_shield = False
+                    self.spawn_explosion(player.rect.center, BLUE, 30)
+                    self.shake(10, 10)
+                    # Push player down
+                    player.rect.y += 100
+        profiler.mark('collide_boss_body')
+
+    def summary(self):
+        wm = self.wave_manager
+        return {
+            'ticks': self.ticks,
+            'sim_seconds': round(self.clock.get_ticks() / 1000, 1),
+            'score': self.score,
+            'wave': 'infinite' if wm.infinite_mode else wm.wave_index + 1,
+            'kills': self.kills,
+            'bosses_killed': self.bosses_killed,
+            'hits_taken': self.hits_taken,
+            'lives': self.player.lives,
+            'game_over': self.game_over,
+        }